@@ -0,0 +1,307 @@
+# command_queue.py
+
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, FrozenSet, Optional
+
+from .config import SafetyLimits
+from .enums import SupplyCommand
+from .parsing import parse_float
+from .pipeline import SupplyPipeline
+from .transport import TimedResponse
+
+
+class CommandQueueError(Exception):
+    pass
+
+
+class Lane(IntEnum):
+    # Lower value is served first
+    EMERGENCY = 0
+    SAFETY = 1
+    NORMAL = 2
+
+
+# Commands that always jump ahead of queued work
+EMERGENCY_COMMANDS: FrozenSet[SupplyCommand] = frozenset({
+    SupplyCommand.CLOSE_OUTPUT,
+    SupplyCommand.OVP_CLEAR,
+})
+
+_STOP = object()
+
+
+class CommandQueue:
+    """
+    Single worker thread that owns one pipeline's port and serves commands
+    from priority lanes.
+
+    Key behaviors:
+    - EMERGENCY before SAFETY before NORMAL; FIFO within a lane
+    - CLOSE_OUTPUT / OVP_CLEAR are routed to EMERGENCY automatically
+    - An exchange already on the wire is never interrupted, so the worst-case
+      wait for an emergency command is one in-flight exchange (bounded by the
+      transport timeout)
+    - After trip(), NORMAL work (queued or new) is rejected with
+      CommandQueueError until reset_trip(); EMERGENCY/SAFETY lanes keep working
+    - Tracks output state from OPEN_OUTPUT / CLOSE_OUTPUT / RESET sent through it
+    - Exposes execute()/send_line() so it can stand in for SupplyPipeline
+    """
+
+    def __init__(self, pipeline: SupplyPipeline, clock: Callable[[], float] = time.monotonic):
+        self.pipeline = pipeline
+        self._queue: "queue.PriorityQueue[tuple[int, int, object]]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._clock = clock
+        self.tripped: Optional[str] = None
+        self.output_on = False           # False also covers "unknown" (never enabled through us)
+        self.output_on_since: Optional[float] = None
+
+    def trip(self, reason: str) -> None:
+        """
+        Latches a safety trip: NORMAL-lane work is refused until reset_trip().
+        """
+        self.tripped = reason
+
+    def reset_trip(self) -> None:
+        self.tripped = None
+
+    def _set_output(self, on: bool) -> None:
+        if on and not self.output_on:
+            self.output_on_since = self._clock()
+        elif not on:
+            self.output_on_since = None
+        self.output_on = on
+
+    def _track_cmd(self, cmd: SupplyCommand) -> None:
+        if cmd == SupplyCommand.OPEN_OUTPUT:
+            self._set_output(True)
+        elif cmd in (SupplyCommand.CLOSE_OUTPUT, SupplyCommand.RESET):
+            self._set_output(False)
+
+    def _track_line(self, line: str) -> None:
+        # Raw (possibly compound) lines: match each fragment against the mapped output commands
+        fragments = [f.strip().lstrip(":") for f in line.split(";")]
+        driver = self.pipeline.driver
+        for cmd in (SupplyCommand.OPEN_OUTPUT, SupplyCommand.CLOSE_OUTPUT, SupplyCommand.RESET):
+            if driver.supports(cmd) and driver.build_command(cmd) in fragments:
+                self._track_cmd(cmd)
+
+    @property
+    def driver(self):
+        return self.pipeline.driver
+
+    @property
+    def transport(self):
+        return self.pipeline.transport
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"cmdq-{self.pipeline.driver.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: Optional[float] = None) -> None:
+        """
+        Lets already-queued work finish, then stops the worker.
+        """
+        if not self.running:
+            return
+        # Sorts after every real lane, so queued commands drain first
+        self._queue.put((len(Lane), next(self._seq), _STOP))
+        self._thread.join(timeout_s)
+        self._thread = None
+
+    def _check_lane(self, lane: Lane) -> None:
+        if lane == Lane.NORMAL and self.tripped is not None:
+            raise CommandQueueError(f"Safety trip latched ({self.tripped}); call reset_trip() to resume")
+
+    def _put(self, lane: Lane, job: Callable[[], str]) -> "Future[str]":
+        if not self.running:
+            raise CommandQueueError("Command queue is not running")
+        self._check_lane(lane)
+        fut: "Future[str]" = Future()
+        self._queue.put((int(lane), next(self._seq), (lane, job, fut)))
+        return fut
+
+    def submit(
+        self,
+        cmd: SupplyCommand,
+        value: Optional[float] = None,
+        channel: Optional[int] = None,
+        expect_response: Optional[bool] = None,
+        lane: Optional[Lane] = None
+    ) -> "Future[str]":
+        if lane is None:
+            lane = Lane.EMERGENCY if cmd in EMERGENCY_COMMANDS else Lane.NORMAL
+
+        def job() -> str:
+            try:
+                return self.pipeline.execute(cmd, value=value, channel=channel, expect_response=expect_response)
+            finally:
+                self._track_cmd(cmd)
+
+        return self._put(lane, job)
+
+    def submit_line(self, line: str, expect_response: bool, lane: Lane = Lane.NORMAL) -> "Future[str]":
+        def job() -> str:
+            try:
+                return self.pipeline.send_line(line, expect_response=expect_response)
+            finally:
+                self._track_line(line)
+
+        return self._put(lane, job)
+
+    def execute(
+        self,
+        cmd: SupplyCommand,
+        value: Optional[float] = None,
+        channel: Optional[int] = None,
+        expect_response: Optional[bool] = None
+    ) -> str:
+        return self.submit(cmd, value=value, channel=channel, expect_response=expect_response).result()
+
+    def send_line(self, line: str, expect_response: bool) -> str:
+        return self.submit_line(line, expect_response=expect_response).result()
+
+    def query_timed(self, cmd: SupplyCommand, channel: Optional[int] = None, settle_s: float = 0.0) -> TimedResponse:
+        # Timestamps are taken by the worker around the wire exchange, so queue wait does not skew t_mid
+        fut: "Future[TimedResponse]" = self._put(
+            Lane.NORMAL,
+            lambda: self.pipeline.query_timed(cmd, channel=channel, settle_s=settle_s),
+        )
+        return fut.result()
+
+    def _run(self) -> None:
+        while True:
+            _, _, item = self._queue.get()
+            if item is _STOP:
+                return
+
+            lane, job, fut = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                # Work queued before a trip must not run after it
+                self._check_lane(lane)
+                fut.set_result(job())
+            except BaseException as e:
+                fut.set_exception(e)
+
+
+@dataclass(frozen=True)
+class SafetyTrip:
+    reason: str
+    voltage: Optional[float]
+    current: Optional[float]
+    timestamp: float
+
+
+class SafetyMonitor:
+    """
+    Fixed-rate V/I watchdog that reads through the SAFETY lane and shuts the
+    output off (EMERGENCY lane) when a configured limit is violated.
+
+    On a trip the queue is latched first (NORMAL work refused), then the
+    output is closed; the monitor stops polling until started again.
+    min_voltage is only checked while the queue knows the output is on, and
+    not during the first period after it was enabled (output still ramping).
+    """
+
+    def __init__(
+        self,
+        cmd_queue: CommandQueue,
+        limits: SafetyLimits,
+        on_trip: Optional[Callable[[SafetyTrip], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.cmd_queue = cmd_queue
+        self.limits = limits
+        self.on_trip = on_trip
+        self.trip: Optional[SafetyTrip] = None
+        self.overruns = 0
+        self._clock = clock
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.trip = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="safety-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+        self._thread = None
+
+    def _read(self, cmd: SupplyCommand) -> Optional[float]:
+        resp = self.cmd_queue.submit(cmd, expect_response=True, lane=Lane.SAFETY).result()
+        return parse_float(resp)
+
+    def _output_settled(self) -> bool:
+        q = self.cmd_queue
+        if not q.output_on or q.output_on_since is None:
+            return False
+        return self._clock() - q.output_on_since >= self.limits.period_s
+
+    def _violation(self, volt: Optional[float], curr: Optional[float]) -> Optional[str]:
+        lim = self.limits
+        if volt is not None and lim.max_voltage is not None and volt > lim.max_voltage:
+            return f"voltage {volt} > max {lim.max_voltage}"
+        if volt is not None and lim.min_voltage is not None and volt < lim.min_voltage and self._output_settled():
+            return f"voltage {volt} < min {lim.min_voltage}"
+        if curr is not None and lim.max_current is not None and curr > lim.max_current:
+            return f"current {curr} > max {lim.max_current}"
+        return None
+
+    def check_once(self) -> Optional[SafetyTrip]:
+        volt = self._read(SupplyCommand.MEASURE_VOLTAGE)
+        curr = self._read(SupplyCommand.MEASURE_CURRENT)
+
+        reason = self._violation(volt, curr)
+        if reason is None:
+            return None
+
+        print(f"[SAFETY][{self.cmd_queue.driver.name}] TRIP: {reason} -> output OFF")
+        # Latch before closing so no queued OPEN_OUTPUT can slip in between
+        self.cmd_queue.trip(reason)
+        self.cmd_queue.submit(SupplyCommand.CLOSE_OUTPUT).result()
+
+        self.trip = SafetyTrip(reason=reason, voltage=volt, current=curr, timestamp=self._clock())
+        if self.on_trip is not None:
+            self.on_trip(self.trip)
+        return self.trip
+
+    def _run(self) -> None:
+        period = self.limits.period_s
+        deadline = self._clock()
+        while not self._stop.is_set():
+            try:
+                if self.check_once() is not None:
+                    return
+            except Exception as e:
+                print(f"[SAFETY][{self.cmd_queue.driver.name}] read failed: {e}")
+
+            # Fixed rate: schedule from the previous deadline, not from "now"
+            deadline += period
+            now = self._clock()
+            if deadline < now:
+                self.overruns += 1
+                deadline = now
+            self._stop.wait(deadline - now)
@@ -1,6 +1,7 @@
 # config.py
 
 from dataclasses import dataclass
+from typing import Optional
 
 @dataclass(frozen=True)
 class SerialConfig:
@@ -12,3 +13,20 @@ class SerialConfig:
     timeout_s: float = 2.0
     write_timeout_s: float = 1.0
     newline: str = "\n"   # bazı cihazlar "\r\n" ister
+
+
+@dataclass(frozen=True)
+class TcpConfig:
+    host: str
+    port: int = 5025              # raw SCPI socket
+    timeout_s: float = 2.0        # per-response read timeout
+    connect_timeout_s: float = 2.0
+    newline: str = "\n"
+
+
+@dataclass(frozen=True)
+class SafetyLimits:
+    max_voltage: Optional[float] = None
+    max_current: Optional[float] = None
+    min_voltage: Optional[float] = None   # e.g. detect a collapsed rail
+    period_s: float = 0.5                 # safety monitor sampling period
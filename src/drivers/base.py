@@ -23,10 +23,51 @@ class PowerSupplyDriver(ABC):
         self,
         cmd: SupplyCommand,
         value: Optional[float] = None,
-        channel: Optional[int] = None
+        channel: Optional[int] = None,
+        current: Optional[float] = None
     ) -> str:
         raise NotImplementedError
 
+    def supports(self, cmd: SupplyCommand) -> bool:
+        """
+        True if this driver can build the given command.
+        """
+        return True
+
+    @property
+    def rails(self) -> tuple[str, ...]:
+        """
+        Output rail names in channel order (channel 1 -> rails[0]).
+        Single-output supplies return an empty tuple.
+        """
+        return ()
+
+    @property
+    def supports_compound(self) -> bool:
+        """
+        True if several commands may be joined into one SCPI line.
+        """
+        return False
+
+    def build_compound(self, lines: list[str]) -> str:
+        """
+        Joins already-built commands into one SCPI compound line.
+
+        Each fragment after the first is rooted with ':' (common '*' commands
+        are left as-is), so subsystem paths from different commands do not
+        inherit each other's header path.
+        """
+        if not lines:
+            raise ValueError("Compound command requires at least one line.")
+
+        parts = [lines[0]]
+        for line in lines[1:]:
+            if line.startswith(("*", ":")):
+                parts.append(line)
+            else:
+                parts.append(":" + line)
+        return ";".join(parts)
+
     def expects_response(self, cmd: SupplyCommand) -> bool:
         """
         Default heuristic:
@@ -36,7 +36,9 @@ def create_driver(profile: SupplyProfile) -> PowerSupplyDriver:
             driver_name=profile.name,
             command_map=command_map,
             expect_response_set=expect_set,
-            value_decimals=3
+            value_decimals=3,
+            rail_names=profile.rails,
+            compound=profile.compound,
         )
 
     raise DriverFactoryError(f"Unsupported driver type: '{profile.driver}'")
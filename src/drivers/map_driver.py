@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Optional, Set
+from typing import Dict, Optional, Set, Tuple
 
 from ..enums import SupplyCommand
 from .base import PowerSupplyDriver
@@ -23,25 +23,41 @@ class MapBasedDriver(PowerSupplyDriver):
 
     Supported placeholders:
       {value}   -> formatted numeric (default 3 decimals)
+      {current} -> formatted numeric current limit (e.g. APPLY)
       {channel} -> integer channel if applicable
+      {rail}    -> rail name for the channel (e.g. P6V), from rail_names
     """
     driver_name: str
     command_map: Dict[SupplyCommand, str]
     expect_response_set: Set[SupplyCommand]
     value_decimals: int = 3
+    rail_names: Tuple[str, ...] = ()
+    compound: bool = False
 
     @property
     def name(self) -> str:
         return self.driver_name
 
+    @property
+    def rails(self) -> tuple[str, ...]:
+        return self.rail_names
+
+    @property
+    def supports_compound(self) -> bool:
+        return self.compound
+
     def expects_response(self, cmd: SupplyCommand) -> bool:
         return cmd in self.expect_response_set
 
+    def supports(self, cmd: SupplyCommand) -> bool:
+        return cmd in self.command_map
+
     def build_command(
         self,
         cmd: SupplyCommand,
         value: Optional[float] = None,
-        channel: Optional[int] = None
+        channel: Optional[int] = None,
+        current: Optional[float] = None
     ) -> str:
         if cmd not in self.command_map:
             raise DriverConfigError(f"Command '{cmd.name}' is not mapped for driver '{self.name}'.")
@@ -58,8 +74,21 @@ class MapBasedDriver(PowerSupplyDriver):
             if channel is None:
                 raise DriverConfigError(f"Command '{cmd.name}' requires 'channel' but none provided.")
             subs["channel"] = str(int(channel))
+        if "{current}" in template:
+            if current is None:
+                raise DriverConfigError(f"Command '{cmd.name}' requires 'current' but none provided.")
+            subs["current"] = f"{current:.{self.value_decimals}f}"
+        if "{rail}" in template:
+            if channel is None:
+                raise DriverConfigError(f"Command '{cmd.name}' requires 'channel' but none provided.")
+            subs["rail"] = self.rail_for_channel(int(channel))
 
         try:
             return template.format(**subs)
         except KeyError as e:
             raise DriverConfigError(f"Template for '{cmd.name}' has unresolved placeholder: {e}") from e
+
+    def rail_for_channel(self, channel: int) -> str:
+        if not 1 <= channel <= len(self.rail_names):
+            raise DriverConfigError(f"Channel {channel} has no rail defined for driver '{self.name}'.")
+        return self.rail_names[channel - 1]
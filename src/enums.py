@@ -34,6 +34,20 @@ class SupplyCommand(Enum):
     SELECT_P25V = auto()
     SELECT_N25V = auto()
 
+    # Per-rail readback without changing the selected rail (E3631A-style)
+    MEASURE_RAIL_VOLTAGE = auto()
+    MEASURE_RAIL_CURRENT = auto()
+
+    # State readback for warm start (programmed values, not measurements)
+    QUERY_VOLTAGE = auto()
+    QUERY_CURRENT = auto()
+    QUERY_OUTPUT = auto()
+    QUERY_OVP = auto()
+    QUERY_OVP_STATE = auto()
+    QUERY_OVP_TRIPPED = auto()
+    QUERY_RAIL = auto()
+    QUERY_RANGE = auto()
+
     # Convenience command (some supplies support APPLY)
     APPLY = auto()
 
@@ -0,0 +1,212 @@
+# hot_reload.py
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .drivers.base import PowerSupplyDriver
+from .drivers.factory import create_driver
+from .pipeline import SupplyPipeline
+from .supply_config import SupplyProfile, load_supply_profiles
+from .transport_factory import LinkConfig, link_config
+
+
+@dataclass(frozen=True)
+class ProfileDiff:
+    added: Tuple[str, ...] = ()
+    removed: Tuple[str, ...] = ()
+    driver_changed: Tuple[str, ...] = ()    # driver type, command map, expect_response, rails, compound
+    link_changed: Tuple[str, ...] = ()      # "transport", "serial" or "tcp" section
+    other_changed: Tuple[str, ...] = ()     # description, safety, ...
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed or self.driver_changed or self.link_changed or self.other_changed)
+
+
+def _driver_key(p: SupplyProfile) -> tuple:
+    return (p.driver, p.command_map_raw, p.expect_response_raw, p.rails, p.compound)
+
+
+def _link_key(p: SupplyProfile) -> tuple:
+    return (p.transport, p.serial, p.tcp)
+
+
+def diff_profiles(old: Dict[str, SupplyProfile], new: Dict[str, SupplyProfile]) -> ProfileDiff:
+    common = [n for n in old if n in new]
+    driver_changed = tuple(n for n in common if _driver_key(old[n]) != _driver_key(new[n]))
+    link_changed = tuple(n for n in common if _link_key(old[n]) != _link_key(new[n]))
+    other_changed = tuple(
+        n for n in common
+        if n not in driver_changed and n not in link_changed and old[n] != new[n]
+    )
+    return ProfileDiff(
+        added=tuple(n for n in new if n not in old),
+        removed=tuple(n for n in old if n not in new),
+        driver_changed=driver_changed,
+        link_changed=link_changed,
+        other_changed=other_changed,
+    )
+
+
+@dataclass
+class LiveSupply:
+    """
+    A supply that is open in this process: its profile, runtime address and pipeline.
+    """
+    profile: SupplyProfile
+    port: str    # serial port, or TCP "host[:port]"
+    pipeline: SupplyPipeline
+
+
+@dataclass(frozen=True)
+class PlannedReload:
+    """
+    What one live supply needs for a reload; None means "unchanged".
+    """
+    key: str
+    profile: SupplyProfile
+    driver: Optional[PowerSupplyDriver] = None
+    link: Optional[LinkConfig] = None
+
+
+class ConfigWatcher:
+    """
+    Polls power_supplies.json and applies changes to open supplies without
+    restarting the process.
+
+    Key behaviors:
+    - Re-runs load_supply_profiles() when the file's mtime/size changes
+    - Changed command map / expect_response / rails: a rebuilt MapBasedDriver is
+      swapped into the pipeline between two commands (port stays open)
+    - Changed serial / tcp parameters: only that supply's link is closed and
+      reopened; switching between serial and tcp needs a restart
+    - A config that fails to load, or whose drivers/links cannot be built, is
+      reported and ignored as a whole; the old one stays live and the file is
+      retried on the next poll
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        supplies: Dict[str, LiveSupply],
+        poll_s: float = 1.0,
+        on_reload: Optional[Callable[[ProfileDiff], None]] = None,
+    ):
+        self.config_path = config_path
+        self.supplies = supplies
+        self.poll_s = poll_s
+        self.on_reload = on_reload
+        self._stamp = self._read_stamp()
+        self._failed_stamp: Optional[Tuple[int, int]] = None
+        _, self._profiles = load_supply_profiles(config_path)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _read_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def check(self) -> Optional[ProfileDiff]:
+        """
+        Reloads if the file changed. Returns the applied diff, or None if nothing
+        changed or the new config was rejected.
+        """
+        stamp = self._read_stamp()
+        if stamp is None or stamp == self._stamp:
+            return None
+
+        try:
+            _, profiles = load_supply_profiles(self.config_path)
+            # Every driver and link is built before any supply is touched
+            plan = self.plan(profiles)
+        except Exception as e:
+            # Retried on every poll until it loads; reported once per file version
+            if stamp != self._failed_stamp:
+                print(f"[RELOAD] Ignoring invalid config {self.config_path}: {e}")
+                self._failed_stamp = stamp
+            return None
+
+        diff = diff_profiles(self._profiles, profiles)
+        self._commit(plan)
+        self._profiles = profiles
+        self._stamp = stamp
+        self._failed_stamp = None
+
+        if diff.changed and self.on_reload is not None:
+            self.on_reload(diff)
+        return diff
+
+    def plan(self, profiles: Dict[str, SupplyProfile]) -> List[PlannedReload]:
+        """
+        Works out what each live supply needs to match `profiles`, comparing
+        against the profile it is actually running. Builds the new drivers and
+        link configs but changes nothing, so a bad mapping raises here.
+        """
+        plan: List[PlannedReload] = []
+        for key, live in self.supplies.items():
+            name = live.profile.name
+            new = profiles.get(name)
+            if new is None:
+                print(f"[RELOAD][{key}] Profile '{name}' removed from config; keeping the running one")
+                continue
+
+            if new.transport != live.profile.transport:
+                print(f"[RELOAD][{key}] Transport changed to '{new.transport}'; restart to apply. Keeping the running profile")
+                continue
+
+            diff = diff_profiles({name: live.profile}, {name: new})
+            plan.append(PlannedReload(
+                key=key,
+                profile=new,
+                driver=create_driver(new) if name in diff.driver_changed else None,
+                link=link_config(new, live.port) if name in diff.link_changed else None,
+            ))
+        return plan
+
+    def apply(self, profiles: Dict[str, SupplyProfile]) -> None:
+        """
+        Brings every live supply in line with `profiles`. Nothing is changed
+        unless every supply's driver and link can be built.
+        """
+        self._commit(self.plan(profiles))
+
+    def _commit(self, plan: List[PlannedReload]) -> None:
+        for step in plan:
+            live = self.supplies[step.key]
+            if step.driver is not None:
+                live.pipeline.swap_driver(step.driver)
+                print(f"[RELOAD][{step.key}] Driver rebuilt for profile '{step.profile.name}'")
+
+            if step.link is not None:
+                live.pipeline.reopen_transport(step.link)
+                print(f"[RELOAD][{step.key}] {live.port} reopened with new {step.profile.transport} parameters")
+
+            live.profile = step.profile
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_s: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_s):
+            try:
+                self.check()
+            except Exception as e:
+                # Keep watching; a failed reopen is reported, not fatal to the watcher
+                print(f"[RELOAD] Reload failed: {e}")
@@ -0,0 +1,174 @@
+# latency.py
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+from .enums import SupplyCommand
+
+
+class LatencyError(ValueError):
+    pass
+
+
+# (profile name, command name or raw line)
+LatencyKey = Tuple[str, str]
+
+# Upper bound for a learned settle (the serial transport's fixed default)
+DEFAULT_SETTLE_S = 0.10
+
+
+@dataclass(frozen=True)
+class CommandTiming:
+    settle_s: Optional[float]    # None -> transport default (0.10 s serial, 0 TCP)
+    timeout_s: Optional[float]   # None -> transport default (profile timeout_s)
+    samples: int
+
+
+def latency_path_for(config_path: str) -> Path:
+    """
+    power_supplies.json -> power_supplies.latency.json (same directory).
+    """
+    p = Path(config_path)
+    return p.with_name(f"{p.stem}.latency.json")
+
+
+def command_key(cmd: Optional[SupplyCommand], line: str) -> str:
+    # Mapped commands by name; raw lines (e.g. compound snapshots) by their text
+    return cmd.name if cmd is not None else line
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted, non-empty list.
+    """
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LatencyTracker:
+    """
+    Learns per-(profile, command) response latency and derives settle and
+    timeout values from it.
+
+    Key behaviors:
+    - Latency is measured from the end of the write to the response line
+      (settle included)
+    - A timed-out query records the timeout it was given and doubles the
+      timeout floor for that command until a response arrives again; a full
+      window of fast samples would otherwise hide the slow one behind p99
+    - timeout = p<timeout_pct> * (1 + margin_ratio) + margin_s, clamped to
+      [min_timeout_s, max_timeout_s]
+    - settle = settle_fraction * p<settle_pct>, never above the default 0.10 s;
+      if the response was already waiting, the measured latency is the settle
+      itself, so an oversized settle shrinks on every call
+    - Until min_samples are seen, the transport defaults are used
+    - Only queries are learned: writes (e.g. *RST, output on/off) get no
+      response to time, so they keep the transport defaults
+    - Persisted as JSON next to the supply config (see latency_path_for)
+    """
+
+    def __init__(
+        self,
+        window: int = 200,
+        min_samples: int = 5,
+        timeout_pct: float = 99.0,
+        settle_pct: float = 5.0,
+        margin_ratio: float = 0.5,
+        margin_s: float = 0.02,
+        settle_fraction: float = 0.5,
+        min_timeout_s: float = 0.05,
+        max_timeout_s: float = 10.0,
+    ):
+        if window < 1 or min_samples < 1:
+            raise LatencyError("window and min_samples must be >= 1")
+        self.window = window
+        self.min_samples = min_samples
+        self.timeout_pct = timeout_pct
+        self.settle_pct = settle_pct
+        self.margin_ratio = margin_ratio
+        self.margin_s = margin_s
+        self.settle_fraction = settle_fraction
+        self.min_timeout_s = min_timeout_s
+        self.max_timeout_s = max_timeout_s
+        self._lock = threading.Lock()
+        self._samples: Dict[LatencyKey, Deque[float]] = {}
+        # Timeout floor after a timeout; cleared by the next response
+        self._floors: Dict[LatencyKey, float] = {}
+
+    def record(self, profile: str, command: str, latency_s: float) -> None:
+        with self._lock:
+            buf = self._samples.get((profile, command))
+            if buf is None:
+                buf = self._samples[(profile, command)] = deque(maxlen=self.window)
+            buf.append(max(0.0, float(latency_s)))
+            self._floors.pop((profile, command), None)
+
+    def record_timeout(self, profile: str, command: str, timeout_s: float, settle_s: float = 0.0) -> None:
+        """
+        A query given timeout_s (after settle_s) got no response: the true
+        latency is at least that long, and the next timeout is at least twice it.
+        """
+        self.record(profile, command, settle_s + timeout_s)
+        with self._lock:
+            self._floors[(profile, command)] = min(2.0 * timeout_s, self.max_timeout_s)
+
+    def samples(self, profile: str, command: str) -> list[float]:
+        with self._lock:
+            return list(self._samples.get((profile, command), ()))
+
+    def timing(self, profile: str, command: str) -> CommandTiming:
+        values = sorted(self.samples(profile, command))
+        if len(values) < self.min_samples:
+            return CommandTiming(settle_s=None, timeout_s=None, samples=len(values))
+
+        timeout = percentile(values, self.timeout_pct) * (1.0 + self.margin_ratio) + self.margin_s
+        timeout = min(max(timeout, self.min_timeout_s), self.max_timeout_s)
+        with self._lock:
+            timeout = max(timeout, self._floors.get((profile, command), 0.0))
+        settle = min(DEFAULT_SETTLE_S, self.settle_fraction * percentile(values, self.settle_pct))
+        return CommandTiming(settle_s=settle, timeout_s=timeout, samples=len(values))
+
+    # --- Persistence ---
+    def to_dict(self) -> dict:
+        out: Dict[str, Dict[str, dict]] = {}
+        with self._lock:
+            keys = list(self._samples)
+        for profile, command in keys:
+            t = self.timing(profile, command)
+            out.setdefault(profile, {})[command] = {
+                "settle_s": None if t.settle_s is None else round(t.settle_s, 6),
+                "timeout_s": None if t.timeout_s is None else round(t.timeout_s, 6),
+                "samples_s": [round(x, 6) for x in self.samples(profile, command)],
+            }
+        return {"version": 1, "profiles": out}
+
+    def save(self, path: str | Path) -> None:
+        p = Path(path)
+        tmp = p.with_name(p.name + ".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        # Replace in one step so a crash never leaves a half-written file
+        tmp.replace(p)
+
+    def load(self, path: str | Path) -> None:
+        """
+        Merges previously saved samples. A missing file is not an error.
+        """
+        p = Path(path)
+        if not p.exists():
+            return
+        try:
+            data = json.loads(p.read_text(encoding="utf-8"))
+            profiles = data["profiles"]
+            for profile, commands in profiles.items():
+                for command, entry in commands.items():
+                    for x in entry.get("samples_s", []):
+                        self.record(profile, command, float(x))
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError, ValueError) as e:
+            raise LatencyError(f"Invalid latency file {p}: {e}") from e
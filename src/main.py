@@ -7,15 +7,19 @@ import argparse
 from .enums import SupplyCommand
 from .supply_config import load_supply_profiles
 from .drivers.factory import create_driver
-from .transport import SerialTransport
-from .config import SerialConfig
+from .transport_factory import create_transport
 from .pipeline import SupplyPipeline
+from .command_queue import CommandQueue, CommandQueueError, SafetyMonitor
+from .playback import WaveformPlayer, load_waveform
+from .rails import MultiRailBatch, RailSetpoint
+from .snapshot import TargetConfig, apply_target
+from .latency import LatencyTracker, latency_path_for
 
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Power Supply Automation (multi-supply, config-driven)")
 
-    p.add_argument("port", help="Serial port (e.g., COM4)")
+    p.add_argument("port", help="Serial port (e.g., COM4), or host[:port] for TCP profiles (e.g., 192.168.1.50)")
     p.add_argument("--config", default="power_supplies.json", help="Supply config JSON path")
     p.add_argument("--supply", default=None, help="Supply profile name (e.g., A, B). If omitted, uses config default.")
 
@@ -34,14 +38,37 @@ def parse_args() -> argparse.Namespace:
                    help="(B/E3631A) Select output rail before VOLT/CURR: P6V, P25V, N25V")
     p.add_argument("--use-apply", action="store_true",
                    help="(B/E3631A) Use APPLY instead of separate VOLT/CURR commands (requires mapping)")
+    p.add_argument("--rail-set", dest="rail_sets", action="append", default=[], metavar="RAIL=VOLT,CURR",
+                   help="(B/E3631A) Program several rails in one batch, e.g. --rail-set P6V=5,0.5 "
+                        "--rail-set N25V=-12,0.1 (repeatable)")
 
     # Common toggles
     p.add_argument("--skip-reset", action="store_true", help="Skip *RST baseline reset")
+    p.add_argument("--warm-start", action="store_true",
+                   help="Instead of *RST, read the current state in one query and send only the settings that differ")
     p.add_argument("--lock-remote", action="store_true", help="Lock front panel keys in remote (SYST:RWLOCK)")
+    p.add_argument("--waveform", default=None, metavar="PATH",
+                   help="Play a voltage/current waveform (CSV: t_s,voltage[,current] or .npy) instead of the golden path")
+    p.add_argument("--waveform-rate", type=float, default=None, metavar="HZ",
+                   help="Point rate for waveforms without a time column")
+    p.add_argument("--learn-timing", action="store_true",
+                   help="Derive per-command settle/timeout from observed latencies "
+                        "(stored next to the config as <config>.latency.json)")
+    p.add_argument("--safety-monitor", action="store_true",
+                   help="Run the background V/I safety monitor using the profile's 'safety' limits")
 
     return p.parse_args()
 
 
+def parse_rail_set(text: str) -> RailSetpoint:
+    try:
+        rail, setpoints = text.split("=", 1)
+        volt, curr = setpoints.split(",", 1)
+        return RailSetpoint(rail=rail.strip().upper(), voltage=float(volt), current=float(curr))
+    except ValueError as e:
+        raise SystemExit(f"Invalid --rail-set '{text}'. Expected RAIL=VOLT,CURR (e.g. P6V=5,0.5)") from e
+
+
 def run_profile_a(pipeline: SupplyPipeline, args: argparse.Namespace) -> None:
     # ---- GOLDEN PATH (A / E3645A) ----
     pipeline.execute(SupplyCommand.SYSTEM_REMOTE, expect_response=False)
@@ -49,27 +76,38 @@ def run_profile_a(pipeline: SupplyPipeline, args: argparse.Namespace) -> None:
     if args.lock_remote:
         pipeline.execute(SupplyCommand.SYSTEM_RWLOCK, expect_response=False)
 
-    pipeline.execute(SupplyCommand.IDN, expect_response=True)
+    if args.warm_start:
+        # Snapshot (includes *IDN?) + only the differing settings replace *RST and the setup block
+        apply_target(pipeline, TargetConfig(
+            voltage=args.volt,
+            current=args.curr,
+            output_on=True,
+            range_mode=args.range_mode,
+            ovp=None if args.skip_ovp else args.ovp,
+            ovp_enabled=None if args.skip_ovp else True,
+        ))
+    else:
+        pipeline.execute(SupplyCommand.IDN, expect_response=True)
 
-    if not args.skip_reset:
-        pipeline.execute(SupplyCommand.RESET, expect_response=False)
+        if not args.skip_reset:
+            pipeline.execute(SupplyCommand.RESET, expect_response=False)
 
-    pipeline.execute(SupplyCommand.CLOSE_OUTPUT, expect_response=False)
+        pipeline.execute(SupplyCommand.CLOSE_OUTPUT, expect_response=False)
 
-    if args.range_mode == "low":
-        pipeline.execute(SupplyCommand.SET_RANGE_LOW, expect_response=False)
-    else:
-        pipeline.execute(SupplyCommand.SET_RANGE_HIGH, expect_response=False)
+        if args.range_mode == "low":
+            pipeline.execute(SupplyCommand.SET_RANGE_LOW, expect_response=False)
+        else:
+            pipeline.execute(SupplyCommand.SET_RANGE_HIGH, expect_response=False)
 
-    if not args.skip_ovp:
-        pipeline.execute(SupplyCommand.OVP_SET, value=args.ovp, expect_response=False)
-        pipeline.execute(SupplyCommand.OVP_ENABLE, expect_response=False)
-        pipeline.execute(SupplyCommand.OVP_CLEAR, expect_response=False)
+        if not args.skip_ovp:
+            pipeline.execute(SupplyCommand.OVP_SET, value=args.ovp, expect_response=False)
+            pipeline.execute(SupplyCommand.OVP_ENABLE, expect_response=False)
+            pipeline.execute(SupplyCommand.OVP_CLEAR, expect_response=False)
 
-    pipeline.execute(SupplyCommand.SET_VOLTAGE, value=args.volt, expect_response=False)
-    pipeline.execute(SupplyCommand.SET_CURRENT, value=args.curr, expect_response=False)
+        pipeline.execute(SupplyCommand.SET_VOLTAGE, value=args.volt, expect_response=False)
+        pipeline.execute(SupplyCommand.SET_CURRENT, value=args.curr, expect_response=False)
 
-    pipeline.execute(SupplyCommand.OPEN_OUTPUT, expect_response=False)
+        pipeline.execute(SupplyCommand.OPEN_OUTPUT, expect_response=False)
 
     pipeline.execute(SupplyCommand.MEASURE_VOLTAGE, expect_response=True)
     pipeline.execute(SupplyCommand.MEASURE_CURRENT, expect_response=True)
@@ -86,13 +124,31 @@ def run_profile_b(pipeline: SupplyPipeline, args: argparse.Namespace) -> None:
         # B profile may or may not support RWLOCK; config decides.
         pipeline.execute(SupplyCommand.SYSTEM_RWLOCK, expect_response=True)
 
+    if args.warm_start and not args.rail_sets:
+        # Snapshot (includes *IDN?) + only the differing settings replace *RST, rail select and setpoints
+        apply_target(pipeline, TargetConfig(voltage=args.volt, current=args.curr, output_on=True, rail=args.rail))
+        run_profile_b_readback(pipeline)
+        return
+
     pipeline.execute(SupplyCommand.IDN, expect_response=True)
 
-    if not args.skip_reset:
+    if not args.skip_reset and not args.warm_start:
         pipeline.execute(SupplyCommand.RESET, expect_response=True)
 
     pipeline.execute(SupplyCommand.CLOSE_OUTPUT, expect_response=True)
 
+    if args.rail_sets:
+        # Batch path: all rails programmed + output on in one exchange, then one readback
+        batch = MultiRailBatch(pipeline)
+        setpoints = [parse_rail_set(x) for x in args.rail_sets]
+        batch.program(setpoints, output_on=True)
+        for reading in batch.measure([sp.rail for sp in setpoints]).values():
+            print(f"[RAIL][{reading.rail}] V={reading.voltage} I={reading.current}")
+
+        pipeline.execute(SupplyCommand.CLOSE_OUTPUT, expect_response=True)
+        pipeline.execute(SupplyCommand.SYSTEM_LOCAL, expect_response=True)
+        return
+
     # Rail selection is mandatory for E3631A-like supplies
     if args.rail == "P6V":
         pipeline.execute(SupplyCommand.SELECT_P6V, expect_response=True)
@@ -103,16 +159,18 @@ def run_profile_b(pipeline: SupplyPipeline, args: argparse.Namespace) -> None:
 
     # Setpoints
     if args.use_apply:
-        # APPLY template depends on mapping; keep as optional
-        # If your mapping is "APPL {voltage},{current}" you should implement that via config placeholders
-        # For now, use separate commands unless you update driver to support named placeholders.
-        pipeline.execute(SupplyCommand.APPLY, value=None, expect_response=True)
+        # APPLY template depends on mapping (e.g. "APPL {rail},{value},{current}")
+        MultiRailBatch(pipeline).program([RailSetpoint(rail=args.rail, voltage=args.volt, current=args.curr)])
     else:
         pipeline.execute(SupplyCommand.SET_VOLTAGE, value=args.volt, expect_response=True)
         pipeline.execute(SupplyCommand.SET_CURRENT, value=args.curr, expect_response=True)
 
     pipeline.execute(SupplyCommand.OPEN_OUTPUT, expect_response=True)
 
+    run_profile_b_readback(pipeline)
+
+
+def run_profile_b_readback(pipeline: SupplyPipeline) -> None:
     pipeline.execute(SupplyCommand.MEASURE_VOLTAGE, expect_response=True)
 
     pipeline.execute(SupplyCommand.MEASURE_CURRENT, expect_response=True)
@@ -121,6 +179,36 @@ def run_profile_b(pipeline: SupplyPipeline, args: argparse.Namespace) -> None:
     pipeline.execute(SupplyCommand.SYSTEM_LOCAL, expect_response=True)
 
 
+def run_waveform(pipeline: SupplyPipeline, args: argparse.Namespace) -> None:
+    points = load_waveform(args.waveform, rate_hz=args.waveform_rate)
+    first = points[0]
+
+    pipeline.execute(SupplyCommand.SYSTEM_REMOTE)
+    pipeline.execute(SupplyCommand.CLOSE_OUTPUT)
+
+    # SET_VOLTAGE/SET_CURRENT act on the selected rail (E3631A-like supplies)
+    select = SupplyCommand[f"SELECT_{args.rail}"]
+    if pipeline.driver.supports(select):
+        pipeline.execute(select)
+
+    # Program the first point with output OFF, then play from t=0
+    pipeline.execute(SupplyCommand.SET_VOLTAGE, value=first.voltage if first.voltage is not None else args.volt)
+    pipeline.execute(SupplyCommand.SET_CURRENT, value=first.current if first.current is not None else args.curr)
+    pipeline.execute(SupplyCommand.OPEN_OUTPUT)
+    try:
+        report = WaveformPlayer(pipeline).play(points)
+    finally:
+        pipeline.execute(SupplyCommand.CLOSE_OUTPUT)
+        pipeline.execute(SupplyCommand.SYSTEM_LOCAL)
+
+    print(
+        f"[PLAYBACK] points={report.points} steps={report.steps} skipped={report.skipped} "
+        f"deduped={report.deduped} missed={report.missed_deadlines} "
+        f"rate={report.achieved_rate_hz:.1f}Hz jitter(mean/max)="
+        f"{report.mean_jitter_s * 1e3:.2f}/{report.max_jitter_s * 1e3:.2f}ms"
+    )
+
+
 def main() -> int:
     args = parse_args()
 
@@ -133,24 +221,36 @@ def main() -> int:
 
     profile = profiles[supply_name]
 
-    cfg: SerialConfig = SerialConfig(
-        port=args.port,
-        baudrate=profile.serial.baudrate,
-        bytesize=profile.serial.bytesize,
-        parity=profile.serial.parity,
-        stopbits=profile.serial.stopbits,
-        timeout_s=profile.serial.timeout_s,
-        write_timeout_s=profile.serial.write_timeout_s,
-        newline=profile.serial.newline,
-    )
-
-    transport = SerialTransport(cfg)
+    # Serial port or TCP host, depending on the profile's "transport"
+    transport = create_transport(profile, args.port)
     driver = create_driver(profile)
-    pipeline = SupplyPipeline(transport=transport, driver=driver)
+
+    latency = None
+    latency_path = latency_path_for(args.config)
+    if args.learn_timing:
+        latency = LatencyTracker()
+        latency.load(latency_path)
+
+    pipeline = SupplyPipeline(transport=transport, driver=driver, latency=latency)
+
+    cmd_queue = None
+    monitor = None
 
     transport.open()
     try:
-        if supply_name == "A":
+        if args.safety_monitor:
+            if profile.safety is None:
+                raise SystemExit(f"Supply profile '{supply_name}' has no 'safety' section.")
+            # All traffic goes through the queue so the monitor gets bounded-latency access
+            cmd_queue = CommandQueue(pipeline)
+            cmd_queue.start()
+            monitor = SafetyMonitor(cmd_queue, profile.safety)
+            monitor.start()
+            pipeline = cmd_queue
+
+        if args.waveform:
+            run_waveform(pipeline, args)
+        elif supply_name == "A":
             run_profile_a(pipeline, args)
         elif supply_name == "B":
             run_profile_b(pipeline, args)
@@ -167,8 +267,20 @@ def main() -> int:
             pipeline.execute(SupplyCommand.CLOSE_OUTPUT, expect_response=False)
             pipeline.execute(SupplyCommand.SYSTEM_LOCAL, expect_response=False)
 
+    except CommandQueueError as e:
+        # Safety trip: output already closed by the monitor; abort the sequence
+        print(f"[SAFETY] Sequence aborted: {e}")
+        return 1
+
     finally:
+        if monitor is not None:
+            monitor.stop()
+        if cmd_queue is not None:
+            cmd_queue.stop()
         transport.close()
+        if latency is not None:
+            latency.save(latency_path)
+            print(f"[TIMING] Latency profile saved to {latency_path}")
 
     return 0
 
@@ -0,0 +1,215 @@
+# measure_cache.py
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Hashable, Optional, Tuple
+
+from .enums import SupplyCommand
+from .pipeline import SupplyPipeline
+from .transport import TimedResponse
+
+
+# Measurement queries that may be served from the cache
+DEFAULT_CACHEABLE: FrozenSet[SupplyCommand] = frozenset({
+    SupplyCommand.MEASURE_VOLTAGE,
+    SupplyCommand.MEASURE_CURRENT,
+    SupplyCommand.MEASURE_RAIL_VOLTAGE,
+    SupplyCommand.MEASURE_RAIL_CURRENT,
+})
+
+# Queries that never change instrument state (do not invalidate)
+READ_ONLY_COMMANDS: FrozenSet[SupplyCommand] = frozenset({
+    SupplyCommand.IDN,
+    SupplyCommand.QUERY_VOLTAGE,
+    SupplyCommand.QUERY_CURRENT,
+    SupplyCommand.QUERY_OUTPUT,
+    SupplyCommand.QUERY_OVP,
+    SupplyCommand.QUERY_OVP_STATE,
+    SupplyCommand.QUERY_OVP_TRIPPED,
+    SupplyCommand.QUERY_RAIL,
+    SupplyCommand.QUERY_RANGE,
+})
+
+# (id of the physical supply's pipeline, command, channel)
+CacheKey = Tuple[int, SupplyCommand, Optional[int]]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0       # callers that waited on another caller's in-flight query
+    invalidations: int = 0
+
+
+class _Flight:
+    """
+    One wire query. Concurrent callers for the same key wait on `done`.
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self.done = threading.Event()
+        self.value = ""
+        self.error: Optional[BaseException] = None
+
+
+class MeasurementCache:
+    """
+    Single-flight, TTL-bounded cache for measurement queries.
+
+    Key behaviors:
+    - Keyed by (pipeline, command, channel); two supplies sharing one profile
+      (e.g. two E3645As on different ports) never share entries
+    - A cached value is served while younger than ttl_s (age counted from query start)
+    - Concurrent callers for the same key share one serial query
+    - The cache subscribes to each pipeline it serves, so any non-read-only
+      command or raw line sent through that pipeline drops its entries, even
+      when the writer bypasses the cache (safety monitor, rail batch, main.py)
+    """
+
+    def __init__(
+        self,
+        ttl_s: float = 0.25,
+        cacheable: FrozenSet[SupplyCommand] = DEFAULT_CACHEABLE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if ttl_s < 0:
+            raise ValueError("ttl_s must be >= 0")
+        self.ttl_s = ttl_s
+        self.cacheable = cacheable
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[CacheKey, _Flight] = {}
+        # Strong refs keep id(pipeline) unique for as long as the cache lives
+        self._attached: Dict[int, SupplyPipeline] = {}
+        self.stats = CacheStats()
+
+    def attach(self, pipeline: SupplyPipeline) -> None:
+        """
+        Subscribes to the pipeline so every write through it invalidates its entries.
+        Called automatically on first use; safe to call repeatedly.
+        """
+        with self._lock:
+            if id(pipeline) in self._attached:
+                return
+            self._attached[id(pipeline)] = pipeline
+        pipeline.add_send_listener(self._on_send)
+
+    def _on_send(self, pipeline: SupplyPipeline, cmd: Optional[SupplyCommand]) -> None:
+        # Raw lines (cmd None) may carry anything, e.g. a compound APPLY
+        if cmd is None or (cmd not in READ_ONLY_COMMANDS and cmd not in self.cacheable):
+            self.invalidate(pipeline)
+
+    def invalidate(self, pipeline: Optional[SupplyPipeline] = None) -> None:
+        """
+        Drops cached values for one supply's pipeline (or all supplies if None).
+        In-flight queries still complete but are not stored.
+        """
+        with self._lock:
+            if pipeline is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == id(pipeline)]:
+                    del self._entries[key]
+            self.stats.invalidations += 1
+
+    def execute(
+        self,
+        pipeline: SupplyPipeline,
+        cmd: SupplyCommand,
+        value: Optional[float] = None,
+        channel: Optional[int] = None,
+        expect_response: Optional[bool] = None
+    ) -> str:
+        self.attach(pipeline)
+
+        if cmd not in self.cacheable or value is not None:
+            # Invalidation (if needed) happens in the pipeline send listener
+            return pipeline.execute(cmd, value=value, channel=channel, expect_response=expect_response)
+
+        key: CacheKey = (id(pipeline), cmd, channel)
+        return self._single_flight(
+            key,
+            lambda: pipeline.execute(cmd, value=None, channel=channel, expect_response=expect_response),
+        )
+
+    def _single_flight(self, key: Hashable, query: Callable[[], str]) -> str:
+        with self._lock:
+            now = self._clock()
+            flight = self._entries.get(key)
+
+            if flight is not None and flight.done.is_set():
+                if flight.error is None and now - flight.started <= self.ttl_s:
+                    self.stats.hits += 1
+                    return flight.value
+                flight = None
+
+            if flight is not None:
+                self.stats.coalesced += 1
+                leader = False
+            else:
+                self.stats.misses += 1
+                flight = _Flight(started=now)
+                self._entries[key] = flight
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = query()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                if self._entries.get(key) is flight:
+                    del self._entries[key]
+            raise
+        finally:
+            flight.done.set()
+
+        return flight.value
+
+
+@dataclass
+class CachedPipeline:
+    """
+    Drop-in front for SupplyPipeline that routes execute() through a
+    (possibly shared) MeasurementCache. Writers may still use the underlying
+    pipeline directly; the cache sees those writes through its send listener.
+    """
+    pipeline: SupplyPipeline
+    cache: MeasurementCache = field(default_factory=MeasurementCache)
+
+    def __post_init__(self) -> None:
+        self.cache.attach(self.pipeline)
+
+    @property
+    def driver(self):
+        return self.pipeline.driver
+
+    @property
+    def transport(self):
+        return self.pipeline.transport
+
+    def execute(
+        self,
+        cmd: SupplyCommand,
+        value: Optional[float] = None,
+        channel: Optional[int] = None,
+        expect_response: Optional[bool] = None
+    ) -> str:
+        return self.cache.execute(self.pipeline, cmd, value=value, channel=channel, expect_response=expect_response)
+
+    def send_line(self, line: str, expect_response: bool) -> str:
+        return self.pipeline.send_line(line, expect_response=expect_response)
+
+    def query_timed(self, cmd: SupplyCommand, channel: Optional[int] = None, settle_s: float = 0.0) -> TimedResponse:
+        # Timed samples must be fresh wire reads, so they are never served from the cache
+        return self.pipeline.query_timed(cmd, channel=channel, settle_s=settle_s)
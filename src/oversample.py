@@ -0,0 +1,175 @@
+# oversample.py
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Optional
+
+from .enums import SupplyCommand
+from .parsing import parse_float, split_compound
+from .pipeline import SupplyPipeline
+
+
+class OversampleError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SampleStats:
+    mean: float
+    std: float          # sample standard deviation of accepted readings
+    sem: float          # max(std, resolution) / sqrt(count), >= resolution / sqrt(12) if std < resolution
+    count: int          # accepted readings
+    rejected: int       # outliers + unparseable responses
+    queries: int        # wire round trips used
+    elapsed_s: float
+    converged: bool     # sem <= tolerance before the budget ran out
+    resolution: float   # reading resolution used as the std floor
+
+
+class RunningStats:
+    """
+    Welford running mean/variance: O(1) per sample, no sample history kept.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self._m2 / (self.count - 1))
+
+    @property
+    def sem(self) -> float:
+        if self.count < 2:
+            return math.inf
+        return self.std / math.sqrt(self.count)
+
+
+def reading_resolution(text: str) -> float:
+    """
+    Last-digit weight of a numeric response: "5.000" -> 0.001,
+    "+5.00000000E+00" -> 1e-8. Returns 0.0 if the text is not numeric.
+    """
+    try:
+        exponent = Decimal(text.strip()).as_tuple().exponent
+    except (AttributeError, InvalidOperation):
+        return 0.0
+    return 10.0 ** exponent if isinstance(exponent, int) else 0.0
+
+
+def measure_adaptive(
+    pipeline: SupplyPipeline,
+    cmd: SupplyCommand = SupplyCommand.MEASURE_VOLTAGE,
+    tolerance: float = 0.001,
+    min_samples: int = 3,
+    max_samples: int = 50,
+    outlier_sigma: float = 4.0,
+    batch_size: int = 4,
+    channel: Optional[int] = None,
+    resolution: Optional[float] = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> SampleStats:
+    """
+    Samples `cmd` until the standard error of the mean drops to `tolerance`
+    (same unit as the reading) or `max_samples` readings have been taken.
+
+    Key behaviors:
+    - The spread is floored at the reading resolution (given, or the coarsest
+      last-digit weight seen in the responses), so quantized readings that all
+      come back identical ("5.000") never report a zero standard error; while
+      the spread stays below one count, the standard error never drops below
+      the quantization noise resolution / sqrt(12), however many readings
+    - Readings further than outlier_sigma * max(std, resolution) from the
+      running mean are rejected once min_samples readings are accepted
+    - If the driver supports compound commands, up to batch_size readings are
+      fetched per round trip ("MEAS:VOLT?;MEAS:VOLT?;...")
+    - Unparseable responses count against the budget as rejected
+    """
+    if tolerance <= 0:
+        raise OversampleError("tolerance must be > 0")
+    if min_samples < 2:
+        raise OversampleError("min_samples must be >= 2")
+    if max_samples < min_samples:
+        raise OversampleError("max_samples must be >= min_samples")
+
+    driver = pipeline.driver
+    line = driver.build_command(cmd, channel=channel)
+    batch_size = max(1, batch_size) if driver.supports_compound else 1
+
+    stats = RunningStats()
+    res = resolution if resolution is not None else 0.0
+    taken = 0
+    rejected = 0
+    queries = 0
+    t0 = clock()
+
+    while taken < max_samples:
+        # Stay within the sample budget
+        n = min(batch_size, max_samples - taken)
+        if n > 1:
+            resps = split_compound(pipeline.send_line(driver.build_compound([line] * n), expect_response=True))
+        else:
+            # Mapped command, so caches and latency tracking see a measurement, not a raw write
+            resps = [pipeline.execute(cmd, channel=channel, expect_response=True)]
+        queries += 1
+        taken += n
+
+        for r in resps[:n]:
+            x = parse_float(r)
+            if x is None:
+                rejected += 1
+                continue
+            if resolution is None:
+                res = max(res, reading_resolution(r))
+            if stats.count >= min_samples:
+                spread = max(stats.std, res)
+                if spread > 0 and abs(x - stats.mean) > outlier_sigma * spread:
+                    rejected += 1
+                    continue
+            stats.add(x)
+        # Missing fields in a short compound response
+        rejected += max(0, n - len(resps))
+
+        if stats.count >= min_samples and _floored_sem(stats, res) <= tolerance:
+            break
+
+    if stats.count == 0:
+        raise OversampleError(f"No valid readings for '{cmd.name}' after {taken} samples.")
+
+    sem = _floored_sem(stats, res)
+    return SampleStats(
+        mean=stats.mean,
+        std=stats.std,
+        sem=sem,
+        count=stats.count,
+        rejected=rejected,
+        queries=queries,
+        elapsed_s=clock() - t0,
+        converged=stats.count >= min_samples and sem <= tolerance,
+        resolution=res,
+    )
+
+
+def _floored_sem(stats: RunningStats, resolution: float) -> float:
+    if stats.count < 2:
+        return math.inf
+    sem = max(stats.std, resolution) / math.sqrt(stats.count)
+    if stats.std < resolution:
+        # Readings do not dither across counts, so averaging cannot beat the
+        # quantization noise of one count (uniform: resolution / sqrt(12))
+        sem = max(sem, resolution / math.sqrt(12.0))
+    return sem
@@ -0,0 +1,25 @@
+# parsing.py
+
+from __future__ import annotations
+
+from typing import Optional
+
+
+def parse_float(text: str) -> Optional[float]:
+    """
+    Parses a numeric instrument response (e.g. "+5.00000000E+00").
+    Returns None for empty or non-numeric text.
+    """
+    try:
+        return float(text.strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+def split_compound(resp: str) -> list[str]:
+    """
+    Splits a SCPI compound query response ("a;b;c") into its fields.
+    """
+    if not resp:
+        return []
+    return [part.strip() for part in resp.split(";")]
@@ -2,24 +2,48 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Union
 
 from .enums import SupplyCommand
-from .transport import SerialTransport
+from .config import SerialConfig, TcpConfig
+from .transport import TimedResponse, Transport
 from .drivers.base import PowerSupplyDriver
+from .latency import LatencyTracker, command_key
+
+
+# Called after every exchange with (pipeline, command); command is None for raw lines
+SendListener = Callable[["SupplyPipeline", Optional[SupplyCommand]], None]
 
 
 @dataclass
 class SupplyPipeline:
-    transport: SerialTransport
+    transport: Transport    # SerialTransport, TcpTransport, ...
     driver: PowerSupplyDriver
 
+    # Optional: learn per-command settle/timeout from observed response latency
+    latency: Optional[LatencyTracker] = None
+
+    # Serializes port access when several threads share one pipeline
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False, compare=False)
+
+    # Observers of everything sent through this pipeline (e.g. cache invalidation)
+    send_listeners: List[SendListener] = field(default_factory=list, init=False, repr=False, compare=False)
+
     # --- Interface Test Hook ---
     def echo_to_console_and_line(self, msg: str) -> None:
         print(f"[ECHO][TX] {msg}")
         self.transport.write_line(msg)
 
+    def add_send_listener(self, listener: SendListener) -> None:
+        if listener not in self.send_listeners:
+            self.send_listeners.append(listener)
+
+    def _notify(self, cmd: Optional[SupplyCommand]) -> None:
+        for listener in list(self.send_listeners):
+            listener(self, cmd)
+
     # --- Execute: build -> send -> optional read ---
     def execute(
         self,
@@ -28,18 +52,79 @@ class SupplyPipeline:
         channel: Optional[int] = None,
         expect_response: Optional[bool] = None
     ) -> str:
-        line = self.driver.build_command(cmd, value=value, channel=channel)
+        # Build + send under the lock so a hot-reloaded driver is swapped in between commands
+        with self._lock:
+            line = self.driver.build_command(cmd, value=value, channel=channel)
+
+            # If user does not override, use driver policy
+            if expect_response is None:
+                expect_response = self.driver.expects_response(cmd)
+
+            return self._send(line, expect_response, cmd)
 
-        # If user does not override, use driver policy
-        if expect_response is None:
-            expect_response = self.driver.expects_response(cmd)
+    # --- Send an already-built line (e.g. SCPI compound commands) ---
+    def send_line(self, line: str, expect_response: bool) -> str:
+        return self._send(line, expect_response, None)
 
-        print(f"[TX][{self.driver.name}] {line}")
+    def _send(self, line: str, expect_response: bool, cmd: Optional[SupplyCommand]) -> str:
+        with self._lock:
+            try:
+                print(f"[TX][{self.driver.name}] {line}")
+
+                if expect_response:
+                    if self.latency is not None:
+                        resp = self._query_learned(line, cmd)
+                    else:
+                        resp = self.transport.send_and_receive(line)
+                    print(f"[RX][{self.driver.name}] {resp}")
+                    return resp
+
+                self.transport.write_line(line)
+                return ""
+            finally:
+                # Even a failed write may have reached the instrument
+                self._notify(cmd)
+
+    def _query_learned(self, line: str, cmd: Optional[SupplyCommand]) -> str:
+        key = command_key(cmd, line)
+        timing = self.latency.timing(self.driver.name, key)
+        timed = self.transport.send_and_receive_timed(line, settle_s=timing.settle_s, timeout_s=timing.timeout_s)
+
+        if timed.text:
+            self.latency.record(self.driver.name, key, timed.t_recv - timed.t_send)
+        elif timing.timeout_s is not None:
+            # Timed out on a learned value: widen the next timeout right away
+            self.latency.record_timeout(self.driver.name, key, timing.timeout_s, settle_s=timing.settle_s)
+        return timed.text
+
+    # --- Query with send/receive timestamps (synchronized sampling) ---
+    def query_timed(
+        self,
+        cmd: SupplyCommand,
+        channel: Optional[int] = None,
+        settle_s: float = 0.0
+    ) -> TimedResponse:
+        # No settle by default: a sleep between send and read would skew t_mid late
+        with self._lock:
+            line = self.driver.build_command(cmd, channel=channel)
+            try:
+                print(f"[TX][{self.driver.name}] {line}")
+                resp = self.transport.send_and_receive_timed(line, settle_s=settle_s)
+                print(f"[RX][{self.driver.name}] {resp.text}")
+                return resp
+            finally:
+                self._notify(cmd)
 
-        if expect_response:
-            resp = self.transport.send_and_receive(line)
-            print(f"[RX][{self.driver.name}] {resp}")
-            return resp
+    # --- Hot reload: swap driver / transport between commands ---
+    def swap_driver(self, driver: PowerSupplyDriver) -> None:
+        with self._lock:
+            self.driver = driver
 
-        self.transport.write_line(line)
-        return ""
+    def reopen_transport(self, cfg: Union[SerialConfig, TcpConfig]) -> None:
+        """
+        Closes the link and opens it again with new parameters of the same kind.
+        """
+        with self._lock:
+            self.transport.close()
+            self.transport.cfg = cfg
+            self.transport.open()
@@ -0,0 +1,233 @@
+# playback.py
+
+from __future__ import annotations
+
+import csv
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional
+
+from .enums import SupplyCommand
+from .pipeline import SupplyPipeline
+
+
+class PlaybackError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class WaveformPoint:
+    t_s: float                  # offset from playback start
+    voltage: Optional[float]    # None -> leave unchanged
+    current: Optional[float] = None
+
+
+_TIME_COLUMNS = ("t_s", "time_s", "time", "t")
+
+
+def _opt_float(x: Any) -> Optional[float]:
+    if x is None or (isinstance(x, str) and not x.strip()):
+        return None
+    return float(x)
+
+
+def _validate(points: List[WaveformPoint]) -> List[WaveformPoint]:
+    if not points:
+        raise PlaybackError("Waveform is empty.")
+    for a, b in zip(points, points[1:]):
+        if b.t_s < a.t_s:
+            raise PlaybackError(f"Waveform time goes backwards at t={b.t_s}.")
+    return points
+
+
+def waveform_from_rows(rows: Iterable[Iterable[Any]], rate_hz: Optional[float] = None) -> List[WaveformPoint]:
+    """
+    Builds a waveform from rows of (t_s, voltage[, current]).
+    With rate_hz, rows are (voltage[, current]) and point i is due at i / rate_hz.
+    Accepts lists, tuples or a 2-D NumPy array; with rate_hz, a flat list or
+    1-D array of voltages works too.
+    """
+    points: List[WaveformPoint] = []
+    for i, row in enumerate(rows):
+        if isinstance(row, (str, bytes)) or not hasattr(row, "__iter__"):
+            row = (row,)
+        vals = [_opt_float(x) for x in row]
+        if rate_hz is not None:
+            vals.insert(0, i / rate_hz)
+        if len(vals) not in (2, 3) or vals[0] is None:
+            raise PlaybackError(f"Row {i} must be (t_s, voltage[, current]); got {list(row)!r}")
+        points.append(WaveformPoint(t_s=vals[0], voltage=vals[1], current=vals[2] if len(vals) == 3 else None))
+    return _validate(points)
+
+
+def load_waveform(path: str, rate_hz: Optional[float] = None) -> List[WaveformPoint]:
+    """
+    Loads a waveform from CSV (header: t_s, voltage[, current]) or .npy.
+    If the CSV has no time column, rate_hz must be given.
+    """
+    p = Path(path)
+    if not p.exists():
+        raise PlaybackError(f"Waveform file not found: {path}")
+
+    if p.suffix.lower() == ".npy":
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise PlaybackError("Loading .npy waveforms requires numpy (pip install numpy)") from e
+        return waveform_from_rows(np.load(p).tolist(), rate_hz=rate_hz)
+
+    with p.open(newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fields = [c.strip().lower() for c in (reader.fieldnames or [])]
+        time_col = next((c for c in _TIME_COLUMNS if c in fields), None)
+        if "voltage" not in fields and "current" not in fields:
+            raise PlaybackError(f"Waveform CSV needs a 'voltage' and/or 'current' column: {path}")
+        if time_col is None and rate_hz is None:
+            raise PlaybackError(f"Waveform CSV has no time column; pass rate_hz: {path}")
+
+        points: List[WaveformPoint] = []
+        for i, raw in enumerate(reader):
+            row = {k.strip().lower(): v for k, v in raw.items() if k is not None}
+            points.append(WaveformPoint(
+                t_s=float(row[time_col]) if time_col is not None else i / rate_hz,
+                voltage=_opt_float(row.get("voltage")),
+                current=_opt_float(row.get("current")),
+            ))
+    return _validate(points)
+
+
+@dataclass
+class PlaybackReport:
+    points: int                 # points in the waveform (= steps + skipped + deduped)
+    steps: int                  # points that caused a write
+    skipped: int                # late points merged into a later one
+    deduped: int                # points served on time but identical to the last write
+    missed_deadlines: int       # skipped points + steps sent later than late_tolerance_s
+    duration_s: float
+    jitter_s: List[float] = field(default_factory=list)   # send time - deadline, per step
+
+    @property
+    def achieved_rate_hz(self) -> float:
+        """
+        Scheduled points serviced (written or deduped) per second.
+        """
+        served = self.steps + self.deduped
+        return served / self.duration_s if self.duration_s > 0 else 0.0
+
+    @property
+    def write_rate_hz(self) -> float:
+        return self.steps / self.duration_s if self.duration_s > 0 else 0.0
+
+    @property
+    def max_jitter_s(self) -> float:
+        return max(self.jitter_s, default=0.0)
+
+    @property
+    def mean_jitter_s(self) -> float:
+        return sum(self.jitter_s) / len(self.jitter_s) if self.jitter_s else 0.0
+
+
+class WaveformPlayer:
+    """
+    Plays a voltage/current waveform on one supply against absolute deadlines.
+
+    Key behaviors:
+    - Deadlines are t0 + point.t_s (monotonic clock), so a slow step never
+      shifts the rest of the waveform
+    - If the player falls behind, all overdue points are merged into the most
+      recent one and only that one is sent
+    - Writes never wait for a response; unchanged values are not re-sent, and
+      V + I go out as one compound line when the driver supports it
+    - Sleeps coarsely, then spins for the last spin_s before each deadline
+    """
+
+    def __init__(
+        self,
+        pipeline: SupplyPipeline,
+        late_tolerance_s: float = 0.005,
+        spin_s: float = 0.002,
+        clock: Callable[[], float] = time.perf_counter,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.pipeline = pipeline
+        self.late_tolerance_s = late_tolerance_s
+        self.spin_s = spin_s
+        self._clock = clock
+        self._sleep = sleep
+
+    def _wait_until(self, deadline: float) -> None:
+        while True:
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                return
+            # Coarse sleep, then spin (yielding the GIL) for the last spin_s
+            self._sleep(remaining - self.spin_s if remaining > self.spin_s else 0)
+
+    def _send(self, voltage: Optional[float], current: Optional[float]) -> None:
+        driver = self.pipeline.driver
+        lines = []
+        if voltage is not None:
+            lines.append(driver.build_command(SupplyCommand.SET_VOLTAGE, value=voltage))
+        if current is not None:
+            lines.append(driver.build_command(SupplyCommand.SET_CURRENT, value=current))
+
+        if len(lines) > 1 and driver.supports_compound:
+            lines = [driver.build_compound(lines)]
+        for line in lines:
+            self.pipeline.send_line(line, expect_response=False)
+
+    def play(self, points: List[WaveformPoint]) -> PlaybackReport:
+        points = _validate(list(points))
+        n = len(points)
+
+        steps = 0
+        skipped = 0
+        deduped = 0
+        missed = 0
+        jitter: List[float] = []
+        last_v: Optional[float] = None
+        last_i: Optional[float] = None
+
+        t0 = self._clock()
+        i = 0
+        while i < n:
+            self._wait_until(t0 + points[i].t_s)
+            now = self._clock()
+
+            # Merge every point that is already due into the latest one
+            j = i
+            while j + 1 < n and t0 + points[j + 1].t_s <= now:
+                j += 1
+            skipped += j - i
+            missed += j - i
+
+            volt = next((p.voltage for p in reversed(points[i:j + 1]) if p.voltage is not None), None)
+            curr = next((p.current for p in reversed(points[i:j + 1]) if p.current is not None), None)
+
+            lateness = now - (t0 + points[j].t_s)
+            if lateness > self.late_tolerance_s:
+                missed += 1
+
+            send_v = volt if volt is not None and volt != last_v else None
+            send_i = curr if curr is not None and curr != last_i else None
+            if send_v is not None or send_i is not None:
+                self._send(send_v, send_i)
+                steps += 1
+                jitter.append(lateness)
+                last_v = volt if volt is not None else last_v
+                last_i = curr if curr is not None else last_i
+            else:
+                deduped += 1
+
+            i = j + 1
+
+        return PlaybackReport(
+            points=n,
+            steps=steps,
+            skipped=skipped,
+            deduped=deduped,
+            missed_deadlines=missed,
+            duration_s=self._clock() - t0,
+            jitter_s=jitter,
+        )
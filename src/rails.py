@@ -0,0 +1,154 @@
+# rails.py
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from .enums import SupplyCommand
+from .parsing import parse_float, split_compound
+from .pipeline import SupplyPipeline
+
+
+class RailBatchError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class RailSetpoint:
+    rail: str        # e.g. "P6V", "P25V", "N25V"
+    voltage: float
+    current: float
+
+
+@dataclass(frozen=True)
+class RailReading:
+    rail: str
+    voltage: Optional[float]
+    current: Optional[float]
+
+
+@dataclass
+class MultiRailBatch:
+    """
+    Programs and reads back all rails of a multi-output supply (E3631A-style)
+    in as few round trips as the profile allows.
+
+    Key behaviors:
+    - Uses APPLY ("APPL {rail},{value},{current}") when mapped, otherwise
+      SELECT_<rail> + SET_VOLTAGE + SET_CURRENT
+    - Uses MEASURE_RAIL_* ("MEAS:VOLT? {rail}") when mapped, otherwise
+      SELECT_<rail> + MEASURE_VOLTAGE/MEASURE_CURRENT
+    - If the driver supports compound commands, everything is sent as one line
+      (program: one write, measure: one query)
+    """
+    pipeline: SupplyPipeline
+
+    @property
+    def rails(self) -> tuple[str, ...]:
+        return self.pipeline.driver.rails
+
+    def _channel(self, rail: str) -> int:
+        try:
+            return self.rails.index(rail) + 1
+        except ValueError as e:
+            raise RailBatchError(
+                f"Unknown rail '{rail}' for supply '{self.pipeline.driver.name}'. "
+                f"Available: {', '.join(self.rails) or '(none)'}"
+            ) from e
+
+    def _build(self, cmd: SupplyCommand, **kwargs) -> str:
+        return self.pipeline.driver.build_command(cmd, **kwargs)
+
+    def _select_line(self, rail: str) -> str:
+        try:
+            cmd = SupplyCommand[f"SELECT_{rail}"]
+        except KeyError as e:
+            raise RailBatchError(f"No SELECT command exists for rail '{rail}'.") from e
+        return self._build(cmd)
+
+    def _program_lines(self, sp: RailSetpoint) -> list[str]:
+        driver = self.pipeline.driver
+        channel = self._channel(sp.rail)
+
+        if driver.supports(SupplyCommand.APPLY):
+            return [self._build(SupplyCommand.APPLY, value=sp.voltage, channel=channel, current=sp.current)]
+
+        return [
+            self._select_line(sp.rail),
+            self._build(SupplyCommand.SET_VOLTAGE, value=sp.voltage),
+            self._build(SupplyCommand.SET_CURRENT, value=sp.current),
+        ]
+
+    def _measure_steps(self, rail: str) -> list[tuple[str, bool]]:
+        """
+        Returns (line, is_query) pairs that read back one rail's V and I.
+        """
+        driver = self.pipeline.driver
+        channel = self._channel(rail)
+
+        if driver.supports(SupplyCommand.MEASURE_RAIL_VOLTAGE) and driver.supports(SupplyCommand.MEASURE_RAIL_CURRENT):
+            return [
+                (self._build(SupplyCommand.MEASURE_RAIL_VOLTAGE, channel=channel), True),
+                (self._build(SupplyCommand.MEASURE_RAIL_CURRENT, channel=channel), True),
+            ]
+
+        return [
+            (self._select_line(rail), False),
+            (self._build(SupplyCommand.MEASURE_VOLTAGE), True),
+            (self._build(SupplyCommand.MEASURE_CURRENT), True),
+        ]
+
+    def program(self, setpoints: Iterable[RailSetpoint], output_on: bool = False) -> list[str]:
+        """
+        Programs every given rail; optionally enables the (shared) output last.
+        Returns the lines written to the transport.
+        """
+        lines: list[str] = []
+        for sp in setpoints:
+            lines.extend(self._program_lines(sp))
+
+        if not lines:
+            raise RailBatchError("No rail setpoints given.")
+
+        if output_on:
+            lines.append(self._build(SupplyCommand.OPEN_OUTPUT))
+
+        if self.pipeline.driver.supports_compound:
+            lines = [self.pipeline.driver.build_compound(lines)]
+
+        for line in lines:
+            self.pipeline.send_line(line, expect_response=False)
+
+        return lines
+
+    def measure(self, rails: Optional[Iterable[str]] = None) -> Dict[str, RailReading]:
+        """
+        Reads voltage and current of every given rail (default: all rails).
+        """
+        rail_list = list(rails) if rails is not None else list(self.rails)
+        if not rail_list:
+            raise RailBatchError(f"Supply '{self.pipeline.driver.name}' has no rails defined.")
+
+        steps: list[tuple[str, bool]] = []
+        for rail in rail_list:
+            steps.extend(self._measure_steps(rail))
+
+        if self.pipeline.driver.supports_compound:
+            line = self.pipeline.driver.build_compound([s for s, _ in steps])
+            values = split_compound(self.pipeline.send_line(line, expect_response=True))
+            expected = sum(1 for _, is_query in steps if is_query)
+            if len(values) != expected:
+                raise RailBatchError(f"Expected {expected} values in compound response, got {len(values)}: {values!r}")
+        else:
+            values = [self.pipeline.send_line(s, expect_response=is_query) for s, is_query in steps]
+            values = [v for v, (_, is_query) in zip(values, steps) if is_query]
+
+        readings: Dict[str, RailReading] = {}
+        for i, rail in enumerate(rail_list):
+            readings[rail] = RailReading(
+                rail=rail,
+                voltage=parse_float(values[2 * i]),
+                current=parse_float(values[2 * i + 1]),
+            )
+        return readings
@@ -0,0 +1,204 @@
+# snapshot.py
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .enums import SupplyCommand
+from .parsing import parse_float, split_compound
+from .pipeline import SupplyPipeline
+
+
+# Snapshot field -> query, in the order they are joined into the compound line
+SNAPSHOT_QUERIES: Tuple[Tuple[str, SupplyCommand], ...] = (
+    ("idn", SupplyCommand.IDN),
+    ("voltage", SupplyCommand.QUERY_VOLTAGE),
+    ("current", SupplyCommand.QUERY_CURRENT),
+    ("output_on", SupplyCommand.QUERY_OUTPUT),
+    ("ovp", SupplyCommand.QUERY_OVP),
+    ("ovp_enabled", SupplyCommand.QUERY_OVP_STATE),
+    ("ovp_tripped", SupplyCommand.QUERY_OVP_TRIPPED),
+    ("rail", SupplyCommand.QUERY_RAIL),
+    ("range", SupplyCommand.QUERY_RANGE),
+)
+
+# Setpoints are programmed with 3 decimals; closer than this counts as equal
+SETPOINT_TOLERANCE = 0.0005
+
+
+def parse_bool(text: str) -> Optional[bool]:
+    """
+    Parses a SCPI boolean response ("1"/"0"/"ON"/"OFF").
+    """
+    t = (text or "").strip().strip('"').upper()
+    if t in ("1", "ON"):
+        return True
+    if t in ("0", "OFF"):
+        return False
+    return None
+
+
+def _parse_text(text: str) -> Optional[str]:
+    t = (text or "").strip().strip('"')
+    return t.upper() or None
+
+
+@dataclass(frozen=True)
+class SupplyState:
+    """
+    Instrument state read back by read_snapshot(). None means "not mapped for
+    this supply" or "response could not be parsed".
+    """
+    idn: Optional[str] = None
+    voltage: Optional[float] = None         # programmed setpoint (selected rail), not a measurement
+    current: Optional[float] = None
+    output_on: Optional[bool] = None
+    ovp: Optional[float] = None
+    ovp_enabled: Optional[bool] = None
+    ovp_tripped: Optional[bool] = None
+    rail: Optional[str] = None              # selected rail, e.g. "P6V"
+    range: Optional[str] = None             # e.g. "P35V"
+
+
+_PARSERS = {
+    "idn": lambda t: (t or "").strip() or None,
+    "voltage": parse_float,
+    "current": parse_float,
+    "output_on": parse_bool,
+    "ovp": parse_float,
+    "ovp_enabled": parse_bool,
+    "ovp_tripped": parse_bool,
+    "rail": _parse_text,
+    "range": _parse_text,
+}
+
+
+@dataclass(frozen=True)
+class TargetConfig:
+    """
+    Desired state for apply_target(). None leaves that setting untouched.
+    """
+    voltage: Optional[float] = None
+    current: Optional[float] = None
+    output_on: Optional[bool] = None
+    ovp: Optional[float] = None
+    ovp_enabled: Optional[bool] = None
+    rail: Optional[str] = None              # "P6V" -> SELECT_P6V
+    range_mode: Optional[str] = None        # "low" / "high" -> SET_RANGE_LOW / SET_RANGE_HIGH
+
+
+# (command, value) pairs, executed in order
+PlannedCommand = Tuple[SupplyCommand, Optional[float]]
+
+
+def read_snapshot(pipeline: SupplyPipeline) -> SupplyState:
+    """
+    Reads every state query the profile maps.
+
+    Key behaviors:
+    - One compound query ("*IDN?;:VOLT?;:CURR?;...") when the driver supports
+      compound commands, otherwise one query per field
+    - If the compound response does not split into one field per query, the
+      snapshot is re-read field by field
+    """
+    driver = pipeline.driver
+    queries = [(name, cmd) for name, cmd in SNAPSHOT_QUERIES if driver.supports(cmd)]
+    if not queries:
+        return SupplyState()
+
+    parts: List[str] = []
+    if driver.supports_compound and len(queries) > 1:
+        line = driver.build_compound([driver.build_command(cmd) for _, cmd in queries])
+        parts = split_compound(pipeline.send_line(line, expect_response=True))
+
+    if len(parts) != len(queries):
+        parts = [pipeline.execute(cmd, expect_response=True) for _, cmd in queries]
+
+    return SupplyState(**{name: _PARSERS[name](text) for (name, _), text in zip(queries, parts)})
+
+
+def _same(actual: Optional[float], wanted: float) -> bool:
+    return actual is not None and abs(actual - wanted) <= SETPOINT_TOLERANCE
+
+
+def _range_name(pipeline: SupplyPipeline, cmd: SupplyCommand) -> Optional[str]:
+    # "VOLT:RANG P35V" -> "P35V", comparable with the VOLT:RANG? response
+    if not pipeline.driver.supports(cmd):
+        return None
+    return pipeline.driver.build_command(cmd).split()[-1].upper()
+
+
+def plan_commands(pipeline: SupplyPipeline, state: SupplyState, target: TargetConfig) -> List[PlannedCommand]:
+    """
+    Returns only the commands needed to move `state` to `target`.
+    Unknown state (None) is treated as different.
+    """
+    plan: List[PlannedCommand] = []
+
+    range_cmd: Optional[SupplyCommand] = None
+    if target.range_mode is not None:
+        range_cmd = SupplyCommand.SET_RANGE_LOW if target.range_mode == "low" else SupplyCommand.SET_RANGE_HIGH
+        name = _range_name(pipeline, range_cmd)
+        if name is not None and state.range == name:
+            range_cmd = None
+
+    # Output goes off first if it must end off, or before a range change
+    if state.output_on is not False and (target.output_on is False or range_cmd is not None):
+        plan.append((SupplyCommand.CLOSE_OUTPUT, None))
+
+    rail_changed = False
+    if target.rail is not None and state.rail != target.rail.upper():
+        plan.append((SupplyCommand[f"SELECT_{target.rail.upper()}"], None))
+        rail_changed = True
+
+    if range_cmd is not None:
+        plan.append((range_cmd, None))
+
+    if target.ovp is not None and not _same(state.ovp, target.ovp):
+        plan.append((SupplyCommand.OVP_SET, target.ovp))
+    if target.ovp_enabled is not None and state.ovp_enabled != target.ovp_enabled:
+        plan.append((SupplyCommand.OVP_ENABLE if target.ovp_enabled else SupplyCommand.OVP_DISABLE, None))
+    if target.ovp_enabled and state.ovp_tripped is not False and pipeline.driver.supports(SupplyCommand.OVP_CLEAR):
+        plan.append((SupplyCommand.OVP_CLEAR, None))
+
+    # V/I readback belongs to the previously selected rail, so a rail change resends both
+    if target.voltage is not None and (rail_changed or not _same(state.voltage, target.voltage)):
+        plan.append((SupplyCommand.SET_VOLTAGE, target.voltage))
+    if target.current is not None and (rail_changed or not _same(state.current, target.current)):
+        plan.append((SupplyCommand.SET_CURRENT, target.current))
+
+    # Unspecified output state: restore it if the range change switched it off
+    want_on = target.output_on if target.output_on is not None else (state.output_on and range_cmd is not None)
+    if want_on and (state.output_on is not True or range_cmd is not None):
+        plan.append((SupplyCommand.OPEN_OUTPUT, None))
+
+    return plan
+
+
+def apply_target(
+    pipeline: SupplyPipeline,
+    target: TargetConfig,
+    state: Optional[SupplyState] = None
+) -> List[PlannedCommand]:
+    """
+    Warm start: snapshot (unless given), then send only the differing commands.
+    Writes go out as one compound line when the driver supports it.
+    Returns the commands that were sent.
+    """
+    if state is None:
+        state = read_snapshot(pipeline)
+
+    plan = plan_commands(pipeline, state, target)
+    if not plan:
+        print(f"[WARM][{pipeline.driver.name}] Already at target; nothing to send")
+        return plan
+
+    driver = pipeline.driver
+    if driver.supports_compound and len(plan) > 1:
+        lines = [driver.build_command(cmd, value=value) for cmd, value in plan]
+        pipeline.send_line(driver.build_compound(lines), expect_response=False)
+    else:
+        for cmd, value in plan:
+            pipeline.execute(cmd, value=value, expect_response=False)
+    return plan
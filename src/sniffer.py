@@ -0,0 +1,662 @@
+# sniffer.py
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import re
+import select
+import threading
+import time
+from array import array
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Protocol
+
+from .latency import percentile
+
+
+class SnifferError(ValueError):
+    pass
+
+
+class ByteSource(Protocol):
+    def readinto(self, buf: memoryview) -> int: ...
+
+
+# Frame directions: "tx" = host -> supply, "rx" = supply -> host,
+# "mixed" = both lines merged onto one tap (classified while pairing)
+DIRECTIONS = ("tx", "rx", "mixed")
+
+
+class ByteRing:
+    """
+    Preallocated byte ring with a timestamp per received chunk.
+
+    Key behaviors:
+    - Sources read straight into the ring through a memoryview (readinto),
+      so no bytes object is created or concatenated per chunk
+    - Offsets are absolute (total bytes ever written); bytes older than
+      `capacity` are overwritten
+    - Chunk start offsets and arrival times live in preallocated arrays,
+      searched by offset to timestamp any byte
+    """
+
+    def __init__(self, capacity: int = 1 << 16, max_chunks: int = 1 << 13):
+        if capacity < 2 or max_chunks < 1:
+            raise SnifferError("capacity must be >= 2 and max_chunks >= 1")
+        self.capacity = capacity
+        self.max_chunks = max_chunks
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._chunk_start = array("q", [0]) * max_chunks
+        self._chunk_time = array("d", [0.0]) * max_chunks
+        self.head = 0       # absolute offset of the next byte
+        self.chunks = 0     # chunks ever written
+
+    @property
+    def tail(self) -> int:
+        """
+        Oldest absolute offset still held.
+        """
+        return max(0, self.head - self.capacity)
+
+    def _commit(self, n: int, t: float) -> None:
+        i = self.chunks % self.max_chunks
+        self._chunk_start[i] = self.head
+        self._chunk_time[i] = t
+        self.chunks += 1
+        self.head += n
+
+    def fill_from(self, source: ByteSource, clock: Callable[[], float], max_read: int = 4096) -> int:
+        """
+        One readinto() into the free contiguous region. Returns bytes read.
+        """
+        pos = self.head % self.capacity
+        n = source.readinto(self._view[pos:pos + min(self.capacity - pos, max_read)]) or 0
+        if n > 0:
+            self._commit(n, clock())
+        return n
+
+    def append(self, data: bytes, t: float) -> None:
+        """
+        Adds bytes produced locally (e.g. a line we wrote) as one chunk.
+        """
+        if len(data) > self.capacity:
+            raise SnifferError("Chunk larger than the ring")
+        first = True
+        mv = memoryview(data)
+        while mv:
+            pos = self.head % self.capacity
+            n = min(len(mv), self.capacity - pos)
+            self._view[pos:pos + n] = mv[:n]
+            if first:
+                self._commit(n, t)
+                first = False
+            else:
+                self.head += n      # same chunk, wrapped
+            mv = mv[n:]
+
+    def find(self, byte: bytes, start: int, end: int) -> int:
+        """
+        Absolute offset of `byte` in [start, end), or -1. Searches in place.
+        """
+        start = max(start, self.tail)
+        while start < end:
+            pos = start % self.capacity
+            stop = min(self.capacity, pos + (end - start))
+            hit = self._buf.find(byte, pos, stop)
+            if hit >= 0:
+                return start + (hit - pos)
+            start += stop - pos
+        return -1
+
+    def copy(self, start: int, end: int) -> bytes:
+        start = max(start, self.tail)
+        out = bytearray()
+        while start < end:
+            pos = start % self.capacity
+            stop = min(self.capacity, pos + (end - start))
+            out += self._view[pos:stop]
+            start += stop - pos
+        return bytes(out)
+
+    def _chunk_index(self, offset: int) -> int:
+        # Last retained chunk whose start <= offset
+        lo = max(0, self.chunks - self.max_chunks)
+        hi = self.chunks - 1
+        if hi < lo:
+            raise SnifferError("Ring is empty")
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._chunk_start[mid % self.max_chunks] <= offset:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def chunk_times(self, start: int, end: int) -> List[float]:
+        """
+        Arrival times of every chunk that holds a byte in [start, end).
+        """
+        first = self._chunk_index(start)
+        last = self._chunk_index(end - 1)
+        return [self._chunk_time[i % self.max_chunks] for i in range(first, last + 1)]
+
+
+@dataclass(frozen=True)
+class Frame:
+    direction: str
+    text: str
+    t_first: float          # arrival of the chunk holding the first byte
+    t_last: float           # arrival of the chunk holding the terminator
+    nbytes: int
+    chunks: int
+    max_gap_s: float        # longest pause between chunks inside the frame
+    noise: int              # bytes outside printable ASCII / CR / LF / TAB
+
+    @property
+    def is_query(self) -> bool:
+        return "?" in self.text
+
+    @property
+    def key(self) -> str:
+        """
+        Command header(s) without arguments, e.g. "VOLT 5.000" -> "VOLT".
+        """
+        return ";".join(part.strip().split(" ", 1)[0] for part in self.text.split(";"))
+
+
+def _noise(raw: bytes) -> int:
+    return sum(1 for b in raw if not (32 <= b < 127 or b in (9, 10, 13)))
+
+
+class FrameDecoder:
+    """
+    Splits one ring into newline-terminated frames as bytes arrive.
+    Frames overwritten before their terminator arrived count as overruns.
+    """
+
+    def __init__(self, ring: ByteRing, direction: str, terminator: bytes = b"\n"):
+        self.ring = ring
+        self.direction = direction
+        self.terminator = terminator
+        self._start = 0
+        self._scan = 0
+        self.overruns = 0
+        self.gaps: Deque[float] = deque(maxlen=10_000)
+
+    @property
+    def partial_bytes(self) -> int:
+        return self.ring.head - self._start
+
+    def feed(self) -> List[Frame]:
+        ring = self.ring
+        if self._start < ring.tail:
+            self.overruns += 1
+            self._start = self._scan = ring.tail
+
+        frames: List[Frame] = []
+        while True:
+            end = ring.find(self.terminator, self._scan, ring.head)
+            if end < 0:
+                self._scan = ring.head
+                return frames
+            frames.append(self._frame(self._start, end + 1))
+            self._start = self._scan = end + 1
+
+    def _frame(self, start: int, end: int) -> Frame:
+        raw = self.ring.copy(start, end)
+        times = self.ring.chunk_times(start, end)
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        self.gaps.extend(gaps)
+        return Frame(
+            direction=self.direction,
+            text=raw.decode("ascii", errors="replace").strip(),
+            t_first=times[0],
+            t_last=times[-1],
+            nbytes=end - start,
+            chunks=len(times),
+            max_gap_s=max(gaps, default=0.0),
+            noise=_noise(raw),
+        )
+
+
+@dataclass(frozen=True)
+class Exchange:
+    command: Frame
+    response: Frame
+
+    @property
+    def gap_s(self) -> float:
+        """
+        Last command byte -> first response byte (instrument think time + line turnaround).
+        """
+        return self.response.t_first - self.command.t_last
+
+    @property
+    def transfer_s(self) -> float:
+        """
+        First -> last response byte (time on the wire).
+        """
+        return self.response.t_last - self.response.t_first
+
+
+@dataclass(frozen=True)
+class PairingResult:
+    exchanges: List[Exchange]
+    unanswered: List[Frame]      # queries with no response within timeout_s
+    unsolicited: List[Frame]     # responses with no pending query
+
+
+# "VOLT", "MEAS:VOLT", "SYST:ERR" (no commas, so "HP,E3631A" is not a header)
+_HEADER_RE = re.compile(r"[A-Za-z][A-Za-z0-9]*(:[A-Za-z][A-Za-z0-9]*)*")
+
+
+def is_response_text(text: str, awaiting_reply: bool) -> bool:
+    """
+    Classifies a frame from a mixed tap by content.
+
+    Key behaviors:
+    - Numbers ("+5.000", "1") and quoted strings are responses
+    - Queries, "*" / ":" commands and header commands ("VOLT 5.000",
+      "SYST:REM") are commands, even while a query is waiting for its reply
+    - Anything else (e.g. "HP,E3631A,0,2.1", "P6V") is a response only if a
+      query is waiting for one
+    """
+    t = text.strip()
+    if not t:
+        return False
+    if t[0] in "+-.0123456789\"":
+        return True
+    if "?" in t or t[0] in "*:":
+        return False
+
+    header, sep, _ = t.partition(" ")
+    if _HEADER_RE.fullmatch(header) and (sep or ":" in header):
+        return False
+    return awaiting_reply
+
+
+def pair_frames(frames: List[Frame], timeout_s: float = 2.0) -> PairingResult:
+    """
+    Matches queries with responses in time order. A query still waiting when
+    the next one is sent is unanswered. Frames from a mixed tap are
+    classified with is_response_text().
+    """
+    exchanges: List[Exchange] = []
+    unanswered: List[Frame] = []
+    unsolicited: List[Frame] = []
+    pending: Deque[Frame] = deque()
+
+    for f in sorted(frames, key=lambda x: x.t_first):
+        while pending and f.t_first - pending[0].t_last > timeout_s:
+            unanswered.append(pending.popleft())
+
+        if f.direction == "mixed":
+            is_response = is_response_text(f.text, awaiting_reply=bool(pending))
+        else:
+            is_response = f.direction == "rx"
+        if not is_response:
+            if f.is_query:
+                # The host only sends the next query once it has given up on the last one
+                unanswered.extend(pending)
+                pending.clear()
+                pending.append(f)
+        elif pending:
+            exchanges.append(Exchange(command=pending.popleft(), response=f))
+        else:
+            unsolicited.append(f)
+
+    unanswered.extend(pending)
+    return PairingResult(exchanges, unanswered, unsolicited)
+
+
+@dataclass(frozen=True)
+class TimingStats:
+    count: int
+    mean_s: float
+    min_s: float
+    p50_s: float
+    p95_s: float
+    max_s: float
+
+    @classmethod
+    def of(cls, values: List[float]) -> Optional["TimingStats"]:
+        if not values:
+            return None
+        v = sorted(values)
+        return cls(
+            count=len(v),
+            mean_s=sum(v) / len(v),
+            min_s=v[0],
+            p50_s=percentile(v, 50),
+            p95_s=percentile(v, 95),
+            max_s=v[-1],
+        )
+
+    def format(self) -> str:
+        return (
+            f"n={self.count} mean={self.mean_s * 1e3:.2f}ms p50={self.p50_s * 1e3:.2f}ms "
+            f"p95={self.p95_s * 1e3:.2f}ms max={self.max_s * 1e3:.2f}ms"
+        )
+
+
+@dataclass
+class SniffSummary:
+    duration_s: float
+    bytes: Dict[str, int]
+    chunks: Dict[str, int]
+    frames: Dict[str, int]
+    overruns: Dict[str, int]
+    partial_bytes: Dict[str, int]
+    noise_bytes: Dict[str, int]
+    exchanges: int
+    unanswered: List[str]
+    unsolicited: List[str]
+    gap_by_command: Dict[str, TimingStats] = field(default_factory=dict)
+    transfer_by_command: Dict[str, TimingStats] = field(default_factory=dict)
+    inter_chunk: Dict[str, TimingStats] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def lines(self) -> List[str]:
+        out = [f"[SNIFF] duration={self.duration_s:.3f}s exchanges={self.exchanges} "
+               f"unanswered={len(self.unanswered)} unsolicited={len(self.unsolicited)}"]
+        for d in self.bytes:
+            out.append(
+                f"[SNIFF][{d}] bytes={self.bytes[d]} chunks={self.chunks[d]} frames={self.frames[d]} "
+                f"noise={self.noise_bytes[d]} overruns={self.overruns[d]} partial={self.partial_bytes[d]}"
+            )
+            if d in self.inter_chunk:
+                out.append(f"[SNIFF][{d}] inter-byte (chunk) gaps: {self.inter_chunk[d].format()}")
+        for key, stats in sorted(self.gap_by_command.items()):
+            out.append(f"[SNIFF][{key}] cmd->resp gap: {stats.format()}")
+            if key in self.transfer_by_command:
+                out.append(f"[SNIFF][{key}] response on wire: {self.transfer_by_command[key].format()}")
+        for text in self.unanswered:
+            out.append(f"[SNIFF] no response to: {text}")
+        return out
+
+
+class _Tap:
+    def __init__(self, direction: str, source: Optional[ByteSource], ring: ByteRing):
+        self.direction = direction
+        self.source = source
+        self.ring = ring
+        self.decoder = FrameDecoder(ring, direction)
+
+
+class SerialSniffer:
+    """
+    Passive line monitor: one ring + frame decoder per tapped line.
+
+    Key behaviors:
+    - Each source is read on its own thread straight into its ring
+    - Frames are decoded by newline as they complete; only finished frames
+      are copied out (for text and output), never individual chunks
+    - summary() pairs queries with responses and reports command->response
+      gaps, response transfer time and inter-chunk (inter-byte) timing
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, Optional[ByteSource]],
+        capacity: int = 1 << 16,
+        max_chunks: int = 1 << 13,
+        max_frames: int = 100_000,
+        max_read: int = 4096,
+        clock: Callable[[], float] = time.perf_counter,
+        on_frame: Optional[Callable[[Frame], None]] = None,
+    ):
+        for d in sources:
+            if d not in DIRECTIONS:
+                raise SnifferError(f"Unknown direction '{d}'. Use one of: {', '.join(DIRECTIONS)}")
+        self.max_read = max_read
+        self._clock = clock
+        self._taps = {d: _Tap(d, s, ByteRing(capacity, max_chunks)) for d, s in sources.items()}
+        self._lock = threading.Lock()
+        self.frames: Deque[Frame] = deque(maxlen=max_frames)
+        self.on_frame = on_frame
+        self._t0: Optional[float] = None
+        self._t_end: Optional[float] = None
+
+    def _emit(self, tap: _Tap) -> None:
+        frames = tap.decoder.feed()
+        if not frames:
+            return
+        with self._lock:
+            self.frames.extend(frames)
+        if self.on_frame is not None:
+            for f in frames:
+                self.on_frame(f)
+
+    def poll(self, direction: str) -> int:
+        """
+        One read on a tapped line; decodes any frames it completes.
+        """
+        tap = self._taps[direction]
+        if tap.source is None:
+            return 0
+        n = tap.ring.fill_from(tap.source, self._clock, self.max_read)
+        if n:
+            self._emit(tap)
+        return n
+
+    def inject(self, direction: str, data: bytes) -> None:
+        """
+        Records bytes we sent ourselves (active probing) on a line we cannot tap.
+        """
+        tap = self._taps[direction]
+        tap.ring.append(data, self._clock())
+        self._emit(tap)
+
+    def run(self, duration_s: float, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        self._t0 = self._clock()
+        deadline = time.monotonic() + duration_s
+
+        def reader(direction: str) -> None:
+            while not stop.is_set() and time.monotonic() < deadline:
+                self.poll(direction)
+
+        threads = [
+            threading.Thread(target=reader, args=(d,), name=f"sniff-{d}", daemon=True)
+            for d, tap in self._taps.items() if tap.source is not None
+        ]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                t.join()
+        finally:
+            stop.set()
+            self._t_end = self._clock()
+
+    def summary(self, timeout_s: float = 2.0) -> SniffSummary:
+        with self._lock:
+            frames = list(self.frames)
+        pairing = pair_frames(frames, timeout_s=timeout_s)
+
+        gaps: Dict[str, List[float]] = {}
+        transfers: Dict[str, List[float]] = {}
+        for ex in pairing.exchanges:
+            gaps.setdefault(ex.command.key, []).append(ex.gap_s)
+            transfers.setdefault(ex.command.key, []).append(ex.transfer_s)
+
+        taps = self._taps.values()
+        inter_chunk = {t.direction: TimingStats.of(list(t.decoder.gaps)) for t in taps}
+
+        t0 = self._t0 if self._t0 is not None else min((f.t_first for f in frames), default=0.0)
+        t_end = self._t_end if self._t_end is not None else max((f.t_last for f in frames), default=t0)
+        return SniffSummary(
+            duration_s=t_end - t0,
+            bytes={t.direction: t.ring.head for t in taps},
+            chunks={t.direction: t.ring.chunks for t in taps},
+            frames={t.direction: sum(1 for f in frames if f.direction == t.direction) for t in taps},
+            overruns={t.direction: t.decoder.overruns for t in taps},
+            partial_bytes={t.direction: t.decoder.partial_bytes for t in taps},
+            noise_bytes={t.direction: sum(f.noise for f in frames if f.direction == t.direction) for t in taps},
+            exchanges=len(pairing.exchanges),
+            unanswered=[f.text for f in pairing.unanswered],
+            unsolicited=[f.text for f in pairing.unsolicited],
+            gap_by_command={k: TimingStats.of(v) for k, v in gaps.items()},
+            transfer_by_command={k: TimingStats.of(v) for k, v in transfers.items()},
+            inter_chunk={d: s for d, s in inter_chunk.items() if s is not None},
+        )
+
+    def write_frames_csv(self, path: str) -> None:
+        with self._lock:
+            frames = sorted(self.frames, key=lambda f: f.t_first)
+        t0 = self._t0 if self._t0 is not None else (frames[0].t_first if frames else 0.0)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["t_first_s", "t_last_s", "direction", "bytes", "chunks", "max_gap_ms", "noise", "text"])
+            for fr in frames:
+                w.writerow([
+                    f"{fr.t_first - t0:.6f}", f"{fr.t_last - t0:.6f}", fr.direction, fr.nbytes,
+                    fr.chunks, f"{fr.max_gap_s * 1e3:.3f}", fr.noise, fr.text,
+                ])
+
+
+class SerialPortSource:
+    """
+    readinto() adapter for a pyserial port that returns as soon as any bytes
+    are available (pyserial's own readinto waits for the full buffer).
+    On POSIX the bytes are read straight into the ring with os.readv.
+    """
+
+    def __init__(self, ser, poll_s: float = 0.05):
+        self.ser = ser
+        self.poll_s = poll_s
+        try:
+            self._fd: Optional[int] = ser.fileno() if hasattr(os, "readv") else None
+        except Exception:
+            self._fd = None
+
+    def readinto(self, buf: memoryview) -> int:
+        if self._fd is not None:
+            readable, _, _ = select.select([self._fd], [], [], self.poll_s)
+            return os.readv(self._fd, [buf]) if readable else 0
+
+        # Block for the first byte (up to the port timeout), then take what is waiting
+        n = min(len(buf), max(1, self.ser.in_waiting))
+        return self.ser.readinto(buf[:n]) or 0
+
+
+def _open_port(url: str, args: argparse.Namespace):
+    import serial
+
+    try:
+        # Also accepts /dev/pts/N (pty taps), loop:// and socket://host:port
+        ser = serial.serial_for_url(
+            url,
+            baudrate=args.baud,
+            parity=args.parity,
+            stopbits=args.stopbits,
+            timeout=0.05,
+            rtscts=False,
+            xonxoff=False,
+            dsrdtr=False,
+        )
+    except Exception as e:
+        raise SystemExit(f"Failed to open {url}: {e}") from e
+    if args.dtr:
+        ser.dtr = True
+    if args.rts:
+        ser.rts = True
+    return ser
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Passive serial line sniffer / SCPI timing analyzer")
+    p.add_argument("--port", help="Single tap (both directions merged, or RX only with --send)")
+    p.add_argument("--tx", help="Port tapping host -> supply")
+    p.add_argument("--rx", help="Port tapping supply -> host")
+    p.add_argument("--baud", type=int, default=9600)
+    p.add_argument("--parity", default="N", choices=["N", "E", "O", "M", "S"])
+    p.add_argument("--stopbits", type=int, default=1, choices=[1, 2])
+    p.add_argument("--dtr", action="store_true", help="Assert DTR on the opened ports")
+    p.add_argument("--rts", action="store_true", help="Assert RTS on the opened ports")
+    p.add_argument("--send", action="append", default=[], metavar="LINE",
+                   help="Actively send LINE on --port and time the reply (repeatable)")
+    p.add_argument("--newline", default="\\r\\n", help="Terminator appended to --send lines")
+    p.add_argument("--duration", type=float, default=10.0, help="Capture time in seconds")
+    p.add_argument("--timeout", type=float, default=2.0, help="Query counts as unanswered after this long")
+    p.add_argument("--quiet", action="store_true", help="Do not print frames as they arrive")
+    p.add_argument("--frames-csv", default=None, metavar="PATH", help="Write every decoded frame to CSV")
+    p.add_argument("--summary-json", default=None, metavar="PATH", help="Write the summary as JSON")
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+
+    if args.port and (args.tx or args.rx):
+        raise SystemExit("Use either --port or --tx/--rx, not both.")
+    if not (args.port or args.tx or args.rx):
+        raise SystemExit("Nothing to sniff: pass --port, or --tx and/or --rx.")
+    if args.send and not args.port:
+        raise SystemExit("--send requires --port.")
+
+    ports = {}
+    if args.port:
+        # With --send we write the TX side ourselves, so the port only carries replies
+        ports["rx" if args.send else "mixed"] = _open_port(args.port, args)
+    if args.tx:
+        ports["tx"] = _open_port(args.tx, args)
+    if args.rx:
+        ports["rx"] = _open_port(args.rx, args)
+
+    sources: Dict[str, Optional[ByteSource]] = {d: SerialPortSource(ser) for d, ser in ports.items()}
+    if args.send:
+        sources["tx"] = None
+
+    def show(f: Frame) -> None:
+        print(f"[SNIFF][{f.direction}] {f.text!r} ({f.nbytes}B, {f.chunks} chunks, max gap {f.max_gap_s * 1e3:.2f}ms)")
+
+    sniffer = SerialSniffer(sources, on_frame=None if args.quiet else show)
+    newline = args.newline.encode().decode("unicode_escape").encode("ascii")
+
+    stop = threading.Event()
+    capture = threading.Thread(target=sniffer.run, args=(args.duration, stop), daemon=True)
+    try:
+        for ser in ports.values():
+            ser.reset_input_buffer()
+
+        capture.start()
+        for line in args.send:
+            port = ports["rx"]
+            payload = line.encode("ascii", errors="replace") + newline
+            port.write(payload)
+            port.flush()
+            sniffer.inject("tx", payload)
+        # Short joins keep Ctrl+C responsive on Windows
+        while capture.is_alive():
+            capture.join(0.2)
+    except KeyboardInterrupt:
+        print("[SNIFF] Interrupted")
+    finally:
+        stop.set()
+        if capture.is_alive():
+            capture.join()
+        for ser in ports.values():
+            ser.close()
+
+    summary = sniffer.summary(timeout_s=args.timeout)
+    for line in summary.lines():
+        print(line)
+
+    if args.frames_csv:
+        sniffer.write_frames_csv(args.frames_csv)
+    if args.summary_json:
+        with open(args.summary_json, "w", encoding="utf-8") as f:
+            json.dump(summary.to_dict(), f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
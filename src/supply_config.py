@@ -7,7 +7,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from .config import SerialConfig
+from .config import SafetyLimits, SerialConfig, TcpConfig
 
 
 class SupplyConfigError(ValueError):
@@ -22,6 +22,11 @@ class SupplyProfile:
     serial: SerialConfig
     command_map_raw: Dict[str, str]
     expect_response_raw: list[str]
+    rails: tuple[str, ...] = ()
+    compound: bool = False
+    safety: Optional[SafetyLimits] = None
+    transport: str = "serial"          # "serial" or "tcp"
+    tcp: Optional[TcpConfig] = None    # set when transport == "tcp"
 
 
 def _require(d: Dict[str, Any], key: str, ctx: str) -> Any:
@@ -30,6 +35,42 @@ def _require(d: Dict[str, Any], key: str, ctx: str) -> Any:
     return d[key]
 
 
+def _optional_float(d: Dict[str, Any], key: str) -> Optional[float]:
+    v = d.get(key)
+    return None if v is None else float(v)
+
+
+def _parse_safety(cfg: Any, name: str) -> SafetyLimits:
+    if not isinstance(cfg, dict):
+        raise SupplyConfigError(f"'safety' must be an object in profile '{name}'.")
+
+    limits = SafetyLimits(
+        max_voltage=_optional_float(cfg, "max_voltage"),
+        max_current=_optional_float(cfg, "max_current"),
+        min_voltage=_optional_float(cfg, "min_voltage"),
+        period_s=float(cfg.get("period_s", 0.5)),
+    )
+    if limits.period_s <= 0:
+        raise SupplyConfigError(f"'safety.period_s' must be > 0 in profile '{name}'.")
+    return limits
+
+
+TRANSPORTS = ("serial", "tcp")
+
+
+def _parse_tcp(cfg: Any, name: str) -> TcpConfig:
+    if not isinstance(cfg, dict):
+        raise SupplyConfigError(f"'tcp' must be an object in profile '{name}'.")
+
+    return TcpConfig(
+        host="__HOST_FROM_CLI__",  # placeholder; overridden at runtime
+        port=int(cfg.get("port", 5025)),
+        timeout_s=float(cfg.get("timeout_s", 2.0)),
+        connect_timeout_s=float(cfg.get("connect_timeout_s", 2.0)),
+        newline=str(cfg.get("newline", "\n")),
+    )
+
+
 def load_supply_profiles(config_path: str) -> tuple[str, Dict[str, SupplyProfile]]:
     """
     Returns: (default_profile_name, profiles_dict)
@@ -54,9 +95,19 @@ def load_supply_profiles(config_path: str) -> tuple[str, Dict[str, SupplyProfile
         driver = _require(cfg, "driver", f"supplies.{name}")
         description = cfg.get("description", "")
 
-        serial_cfg = _require(cfg, "serial", f"supplies.{name}")
+        transport = str(cfg.get("transport", "serial")).lower()
+        if transport not in TRANSPORTS:
+            raise SupplyConfigError(
+                f"'transport' must be one of {', '.join(TRANSPORTS)} in profile '{name}' (got '{transport}')."
+            )
+
+        # A TCP-only profile may omit the serial section
+        serial_cfg = cfg.get("serial", {}) if transport == "tcp" else _require(cfg, "serial", f"supplies.{name}")
         command_map = _require(cfg, "command_map", f"supplies.{name}")
         expect_response = cfg.get("expect_response", [])
+        rails = cfg.get("rails", [])
+        compound = cfg.get("compound", False)
+        safety_cfg = cfg.get("safety")
 
         serial = SerialConfig(
             port="__PORT_FROM_CLI__",  # placeholder; overridden at runtime
@@ -75,6 +126,12 @@ def load_supply_profiles(config_path: str) -> tuple[str, Dict[str, SupplyProfile
         if not isinstance(expect_response, list):
             raise SupplyConfigError(f"'expect_response' must be a list in profile '{name}'.")
 
+        if not isinstance(rails, list):
+            raise SupplyConfigError(f"'rails' must be a list in profile '{name}'.")
+
+        if not isinstance(compound, bool):
+            raise SupplyConfigError(f"'compound' must be true or false in profile '{name}'.")
+
         profiles[name] = SupplyProfile(
             name=name,
             description=str(description),
@@ -82,6 +139,11 @@ def load_supply_profiles(config_path: str) -> tuple[str, Dict[str, SupplyProfile
             serial=serial,
             command_map_raw={str(k): str(v) for k, v in command_map.items()},
             expect_response_raw=[str(x) for x in expect_response],
+            rails=tuple(str(x) for x in rails),
+            compound=compound,
+            safety=_parse_safety(safety_cfg, name) if safety_cfg is not None else None,
+            transport=transport,
+            tcp=_parse_tcp(cfg.get("tcp", {}), name) if transport == "tcp" else None,
         )
 
     if default_name not in profiles:
@@ -0,0 +1,154 @@
+# sync_sampler.py
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .enums import SupplyCommand
+from .parsing import parse_float
+from .pipeline import SupplyPipeline
+
+
+class SyncSamplerError(Exception):
+    pass
+
+
+@dataclass
+class SupplySeries:
+    """
+    Per-supply samples; index i belongs to round i.
+    All timestamps are time.perf_counter() seconds.
+    """
+    values: List[Optional[float]] = field(default_factory=list)
+    t_send: List[float] = field(default_factory=list)
+    t_recv: List[float] = field(default_factory=list)
+    t_mid: List[float] = field(default_factory=list)
+
+
+@dataclass
+class SyncResult:
+    t_ref: List[float]                 # per-round reference time (mean of all midpoints)
+    series: Dict[str, SupplySeries]
+
+    def skew(self, supply: str) -> List[float]:
+        """
+        Per-round offset of a supply's sample midpoint from the round reference time.
+        """
+        return [m - r for m, r in zip(self.series[supply].t_mid, self.t_ref)]
+
+    def aligned(self) -> Dict[str, List[Optional[float]]]:
+        """
+        Every supply's values linearly interpolated onto the shared t_ref grid.
+        Points outside a supply's sampled span are clamped to its nearest sample.
+        """
+        return {name: _interpolate(s.t_mid, s.values, self.t_ref) for name, s in self.series.items()}
+
+
+def _interpolate(ts: List[float], ys: List[Optional[float]], grid: List[float]) -> List[Optional[float]]:
+    pts = [(t, y) for t, y in zip(ts, ys) if y is not None]
+    if not pts:
+        return [None] * len(grid)
+
+    xs = [t for t, _ in pts]
+    out: List[Optional[float]] = []
+    for g in grid:
+        i = bisect_left(xs, g)
+        if i <= 0:
+            out.append(pts[0][1])
+        elif i >= len(pts):
+            out.append(pts[-1][1])
+        else:
+            (t0, y0), (t1, y1) = pts[i - 1], pts[i]
+            w = (g - t0) / (t1 - t0) if t1 > t0 else 0.0
+            out.append(y0 + w * (y1 - y0))
+    return out
+
+
+class SynchronizedSampler:
+    """
+    Queries several supplies at the same instant, once per round.
+
+    Key behaviors:
+    - One worker thread per supply; all workers are released from a shared
+      barrier at the start of every round, so queries hit the wires together
+    - Each sample records send/receive timestamps; the midpoint is used as the
+      sample time
+    - Results can be interpolated onto a common per-round time grid
+    - Accepts SupplyPipeline, CommandQueue or CachedPipeline (anything with
+      query_timed); a CommandQueue keeps port access serialized with the
+      safety monitor, at the cost of up to one in-flight exchange of extra skew
+    """
+
+    def __init__(
+        self,
+        pipelines: Dict[str, SupplyPipeline],
+        cmd: SupplyCommand = SupplyCommand.MEASURE_VOLTAGE,
+        channel: Optional[int] = None,
+    ):
+        if not pipelines:
+            raise SyncSamplerError("At least one pipeline is required.")
+        self.pipelines = pipelines
+        self.cmd = cmd
+        self.channel = channel
+
+    def run(self, rounds: int, period_s: float = 0.0) -> SyncResult:
+        """
+        Takes `rounds` synchronized samples. With period_s > 0, rounds start on a
+        fixed grid (t0 + i * period_s); otherwise each round starts as soon as the
+        slowest supply has answered the previous one.
+        """
+        if rounds < 1:
+            raise SyncSamplerError("rounds must be >= 1")
+
+        names = list(self.pipelines)
+        series = {name: SupplySeries() for name in names}
+        errors: List[BaseException] = []
+        t0 = time.perf_counter()
+
+        next_round = [0]
+
+        def pace() -> None:
+            # Barrier action: runs in one thread once every worker has arrived
+            if period_s > 0:
+                delay = t0 + next_round[0] * period_s - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            next_round[0] += 1
+
+        barrier = threading.Barrier(len(names), action=pace)
+
+        def worker(name: str) -> None:
+            pipeline = self.pipelines[name]
+            out = series[name]
+            try:
+                for _ in range(rounds):
+                    barrier.wait()
+                    resp = pipeline.query_timed(self.cmd, channel=self.channel)
+                    out.values.append(parse_float(resp.text))
+                    out.t_send.append(resp.t_send)
+                    out.t_recv.append(resp.t_recv)
+                    out.t_mid.append(resp.t_mid)
+            except threading.BrokenBarrierError:
+                pass
+            except BaseException as e:
+                errors.append(e)
+                barrier.abort()
+
+        threads = [threading.Thread(target=worker, args=(name,), name=f"sync-{name}") for name in names]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        if errors:
+            raise SyncSamplerError(f"Synchronized sampling failed: {errors[0]}") from errors[0]
+
+        t_ref = [
+            sum(series[name].t_mid[i] for name in names) / len(names)
+            for i in range(rounds)
+        ]
+        return SyncResult(t_ref=t_ref, series=series)
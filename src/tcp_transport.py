@@ -0,0 +1,224 @@
+# tcp_transport.py
+
+from __future__ import annotations
+
+import select
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .config import TcpConfig
+from .transport import TimedResponse, Transport, TransportError
+
+
+class TcpTransportError(TransportError):
+    pass
+
+
+# (host, port)
+PoolKey = Tuple[str, int]
+
+
+def _is_alive(sock: socket.socket) -> bool:
+    """
+    True if an idle socket is still connected. Stale bytes left by a previous
+    user are drained; an orderly close by the peer reads as b"".
+    """
+    try:
+        while True:
+            readable, _, _ = select.select([sock], [], [], 0)
+            if not readable:
+                return True
+            if not sock.recv(4096):
+                return False
+    except OSError:
+        return False
+
+
+def _connect(cfg: TcpConfig) -> socket.socket:
+    try:
+        sock = socket.create_connection((cfg.host, cfg.port), timeout=cfg.connect_timeout_s)
+    except OSError as e:
+        raise TcpTransportError(f"Failed to connect to {cfg.host}:{cfg.port}: {e}") from e
+
+    # SCPI lines are tiny; do not let Nagle hold them back
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+class TcpConnectionPool:
+    """
+    Keeps idle SCPI sockets open between transport open()/close() cycles.
+
+    Key behaviors:
+    - Keyed by (host, port); acquire() reuses an idle socket if it is still
+      connected, otherwise connects a new one
+    - release() parks the socket for reuse (up to max_idle per key);
+      discard() closes it for good (e.g. after an I/O error)
+    - Many LAN instruments accept only one or two SCPI sessions, so a
+      reconnect per sequence is avoided rather than multiplexed
+    """
+
+    def __init__(self, max_idle: int = 1):
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: Dict[PoolKey, List[socket.socket]] = {}
+        self.connects = 0
+        self.reuses = 0
+
+    def acquire(self, cfg: TcpConfig) -> socket.socket:
+        key = (cfg.host, cfg.port)
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                sock = idle.pop() if idle else None
+            if sock is None:
+                break
+            if _is_alive(sock):
+                with self._lock:
+                    self.reuses += 1
+                return sock
+            sock.close()
+
+        sock = _connect(cfg)
+        with self._lock:
+            self.connects += 1
+        return sock
+
+    def release(self, cfg: TcpConfig, sock: socket.socket) -> None:
+        key = (cfg.host, cfg.port)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(sock)
+                return
+        sock.close()
+
+    def discard(self, sock: socket.socket) -> None:
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def close_all(self) -> None:
+        with self._lock:
+            socks = [s for idle in self._idle.values() for s in idle]
+            self._idle.clear()
+        for sock in socks:
+            self.discard(sock)
+
+
+# Shared by every TcpTransport unless one is given explicitly
+DEFAULT_POOL = TcpConnectionPool()
+
+
+class TcpTransport(Transport):
+    """
+    Raw SCPI over TCP (socket port 5025).
+
+    Key behaviors:
+    - Same line protocol as SerialTransport: writes append cfg.newline,
+      reads return one stripped line or "" on timeout
+    - Connections come from a TcpConnectionPool; close() hands the socket
+      back instead of tearing it down
+    - Stale input is drained before each query (like reset_input_buffer)
+    - No settle delay by default: the read blocks until the line arrives
+    """
+
+    default_settle_s = 0.0
+
+    def __init__(self, cfg: TcpConfig, pool: Optional[TcpConnectionPool] = DEFAULT_POOL):
+        self.cfg = cfg
+        self.pool = pool
+        self._sock: Optional[socket.socket] = None
+        self._rx = bytearray()
+
+    def open(self) -> None:
+        if self._sock is not None:
+            return
+        self._sock = self.pool.acquire(self.cfg) if self.pool is not None else _connect(self.cfg)
+        self._rx.clear()
+
+    def close(self) -> None:
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        # Leftover bytes are drained when the pooled socket is next acquired
+        if self.pool is not None:
+            self.pool.release(self.cfg, sock)
+        else:
+            sock.close()
+        self._rx.clear()
+
+    def _require_open(self) -> socket.socket:
+        if self._sock is None:
+            raise TcpTransportError("TCP connection is not open")
+        return self._sock
+
+    def _fail(self, msg: str, e: Optional[BaseException] = None) -> TcpTransportError:
+        # A broken socket must never go back to the pool
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        self._rx.clear()
+        return TcpTransportError(f"{msg} ({self.cfg.host}:{self.cfg.port}){f': {e}' if e else ''}")
+
+    def write_line(self, line: str) -> None:
+        sock = self._require_open()
+        payload = (line + self.cfg.newline).encode("utf-8", errors="replace")
+        try:
+            sock.sendall(payload)
+        except OSError as e:
+            raise self._fail("TCP write failed", e) from e
+
+    def _read_line(self, timeout_s: float) -> str:
+        sock = self._require_open()
+        deadline = time.monotonic() + timeout_s
+        while True:
+            nl = self._rx.find(b"\n")
+            if nl >= 0:
+                raw = bytes(self._rx[:nl + 1])
+                del self._rx[:nl + 1]
+                return raw.decode("utf-8", errors="replace").strip()
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return ""
+            sock.settimeout(remaining)
+            try:
+                chunk = sock.recv(4096)
+            except socket.timeout:
+                return ""
+            except OSError as e:
+                raise self._fail("TCP read failed", e) from e
+            if not chunk:
+                raise self._fail("TCP connection closed by instrument")
+            self._rx += chunk
+
+    def read_line(self) -> str:
+        return self._read_line(self.cfg.timeout_s)
+
+    def _drain(self) -> None:
+        sock = self._require_open()
+        self._rx.clear()
+        if not _is_alive(sock):
+            raise self._fail("TCP connection closed by instrument")
+
+    def send_and_receive_timed(
+        self,
+        line: str,
+        settle_s: Optional[float] = None,
+        timeout_s: Optional[float] = None
+    ) -> TimedResponse:
+        self._drain()
+        self.write_line(line)
+        t_send = time.perf_counter()
+
+        if settle_s is None:
+            settle_s = self.default_settle_s
+        if settle_s > 0:
+            time.sleep(settle_s)
+
+        resp = self._read_line(self.cfg.timeout_s if timeout_s is None else timeout_s)
+        return TimedResponse(resp, t_send, time.perf_counter())
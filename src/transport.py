@@ -3,19 +3,79 @@
 from __future__ import annotations
 
 import time
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional
 
 import serial
 
 from .config import SerialConfig
 
 
-class SerialTransportError(Exception):
+class TransportError(Exception):
     pass
 
 
-class SerialTransport:
+class SerialTransportError(TransportError):
+    pass
+
+
+@dataclass(frozen=True)
+class TimedResponse:
+    text: str
+    t_send: float   # time.perf_counter() right after the query was flushed
+    t_recv: float   # time.perf_counter() right after the response line arrived
+
+    @property
+    def t_mid(self) -> float:
+        """
+        Best estimate of when the instrument took the reading.
+        """
+        return (self.t_send + self.t_recv) / 2.0
+
+
+class Transport(ABC):
+    """
+    Contract the pipeline depends on: a line-oriented link to one instrument.
+
+    Implementations keep their link settings in `cfg` (SerialConfig, TcpConfig)
+    so the pipeline can reopen them with new parameters.
+    """
+    cfg: Any
+
+    # Wait between query and read when the caller does not pass settle_s
+    default_settle_s: float = 0.0
+
+    @abstractmethod
+    def open(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def write_line(self, line: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_line(self) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    def send_and_receive_timed(
+        self,
+        line: str,
+        settle_s: Optional[float] = None,
+        timeout_s: Optional[float] = None
+    ) -> TimedResponse:
+        raise NotImplementedError
+
+    def send_and_receive(self, line: str, settle_s: Optional[float] = None, timeout_s: Optional[float] = None) -> str:
+        return self.send_and_receive_timed(line, settle_s=settle_s, timeout_s=timeout_s).text
+
+
+class SerialTransport(Transport):
     """
     Thin serial transport wrapper.
 
@@ -25,6 +85,8 @@ class SerialTransport:
     - short settle delay before reading (instrument-friendly)
     """
 
+    default_settle_s = 0.10
+
     def __init__(self, cfg: SerialConfig):
         self.cfg = cfg
         self._ser: Optional[serial.Serial] = None
@@ -83,8 +145,20 @@ class SerialTransport:
         except Exception as e:
             raise SerialTransportError(f"Serial read failed: {e}") from e
 
-    def send_and_receive(self, line: str, settle_s: float = 0.10) -> str:
+    def send_and_receive_timed(
+        self,
+        line: str,
+        settle_s: Optional[float] = None,
+        timeout_s: Optional[float] = None
+    ) -> TimedResponse:
+        """
+        timeout_s overrides the profile timeout for this query only (e.g. a
+        learned per-command value); None keeps the port's own timeout.
+        """
         ser = self._require_open()
+        if settle_s is None:
+            settle_s = self.default_settle_s
+        port_timeout = getattr(ser, "timeout", None)
 
         # Clear stale buffered responses before issuing a new query
         try:
@@ -111,24 +185,34 @@ class SerialTransport:
 
         try:
             self.write_line(line)
+            t_send = time.perf_counter()
 
             # Cihaza cevap üretmesi için küçük bir pencere
             if settle_s > 0:
                 time.sleep(settle_s)
 
             # Tek-shot read yerine deadline ile retry (intermittent boş RX'i bitirir)
-            timeout_s = float(getattr(ser, "timeout", 1.0) or 1.0)
-            deadline = time.monotonic() + max(timeout_s, 1.0)
+            if timeout_s is None:
+                deadline = time.monotonic() + max(float(port_timeout or 1.0), 1.0)
+            else:
+                # A single readline must not block past the shorter deadline
+                if port_timeout is None or timeout_s < port_timeout:
+                    ser.timeout = timeout_s
+                deadline = time.monotonic() + timeout_s
 
             resp = ""
             while time.monotonic() < deadline:
                 resp = self.read_line()
                 if resp:
-                    return resp
+                    return TimedResponse(resp, t_send, time.perf_counter())
                 time.sleep(0.02)  # 20 ms backoff
 
-            return resp  # "" dönebilir; üst katman bunu handle etmeli
+            # "" dönebilir; üst katman bunu handle etmeli
+            return TimedResponse(resp, t_send, time.perf_counter())
         finally:
+            if timeout_s is not None and ser.timeout != port_timeout:
+                ser.timeout = port_timeout
+
             # Cevabı okuduktan (veya timeout olduktan) sonra DTR'yi bırak
             try:
                 ser.setDTR(False)
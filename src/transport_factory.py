@@ -0,0 +1,68 @@
+# transport_factory.py
+
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Optional, Tuple, Union
+
+from .config import SerialConfig, TcpConfig
+from .supply_config import SupplyProfile
+from .tcp_transport import DEFAULT_POOL, TcpConnectionPool, TcpTransport
+from .transport import SerialTransport, Transport
+
+
+class TransportFactoryError(ValueError):
+    pass
+
+
+LinkConfig = Union[SerialConfig, TcpConfig]
+
+
+def _split_host_port(address: str) -> Tuple[str, Optional[int]]:
+    if address.startswith("["):
+        host, sep, rest = address[1:].partition("]")
+        if not sep or (rest and not (rest.startswith(":") and rest[1:].isdigit())):
+            raise TransportFactoryError(f"Invalid TCP address '{address}'; expected [v6] or [v6]:port")
+        return host, int(rest[1:]) if rest else None
+
+    # More than one colon is an IPv6 literal without a port
+    if address.count(":") != 1:
+        return address, None
+
+    host, _, port = address.partition(":")
+    if not host or not port.isdigit():
+        raise TransportFactoryError(f"Invalid TCP address '{address}'; expected host or host:port")
+    return host, int(port)
+
+
+def link_config(profile: SupplyProfile, address: str) -> LinkConfig:
+    """
+    Fills the runtime address into the profile's link settings.
+
+    serial: address is the port name (e.g. COM4)
+    tcp:    address is "host", "host:port" or "[v6]:port" (port overrides the
+            profile's); a bare IPv6 literal such as fe80::1 is a host
+    """
+    if profile.transport == "serial":
+        return replace(profile.serial, port=address)
+
+    if profile.transport == "tcp":
+        if profile.tcp is None:
+            raise TransportFactoryError(f"Supply profile '{profile.name}' has no 'tcp' settings.")
+        host, port = _split_host_port(address)
+        if port is None:
+            return replace(profile.tcp, host=host)
+        return replace(profile.tcp, host=host, port=port)
+
+    raise TransportFactoryError(f"Unsupported transport type: '{profile.transport}'")
+
+
+def create_transport(
+    profile: SupplyProfile,
+    address: str,
+    pool: Optional[TcpConnectionPool] = DEFAULT_POOL
+) -> Transport:
+    cfg = link_config(profile, address)
+    if isinstance(cfg, TcpConfig):
+        return TcpTransport(cfg, pool=pool)
+    return SerialTransport(cfg)
@@ -1,20 +1,44 @@
-import serial, time
-
-ser = serial.Serial("COM7", 9600, timeout=0.2, rtscts=False, xonxoff=False, dsrdtr=False)
-ser.dtr = True
-ser.rts = True
-time.sleep(0.2)
-
-ser.reset_input_buffer()
-ser.write(b"*IDN?\r\n"); ser.flush()
-
-buf = b""
-t0 = time.time()
-while time.time() - t0 < 3.0:
-    chunk = ser.read(256)
-    if chunk:
-        buf += chunk
-        print("GOT:", chunk)
-print("TOTAL:", buf)
-
-ser.close()
+# test_buffer_sniff.py
+#
+# Active probe: sends a query on a real port and sniffs the reply with
+# src.sniffer (ring buffer + per-chunk timestamps), then prints the timing
+# summary. Run from the repository root:
+#
+#   python -m test_scripts.test_buffer_sniff COM7
+#   python -m test_scripts.test_buffer_sniff COM7 --send "MEAS:VOLT?" --duration 5
+#
+# For passive monitoring use the sniffer directly:
+#   python -m src.sniffer --tx COM8 --rx COM9 --duration 60
+
+import argparse
+
+from src.sniffer import main as sniffer_main
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Send a query and sniff the reply bytes with timing")
+    p.add_argument("port", help="Serial port (e.g., COM7)")
+    p.add_argument("--baud", type=int, default=9600)
+    p.add_argument("--send", action="append", default=None, metavar="LINE", help="Query to send (default: *IDN?)")
+    p.add_argument("--duration", type=float, default=3.0, help="Capture time in seconds")
+    p.add_argument("--newline", default="\\r\\n")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    argv = [
+        "--port", args.port,
+        "--baud", str(args.baud),
+        "--duration", str(args.duration),
+        "--newline", args.newline,
+        # Same line state as the original ad-hoc script
+        "--dtr", "--rts",
+    ]
+    for line in args.send or ["*IDN?"]:
+        argv += ["--send", line]
+    return sniffer_main(argv)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,173 @@
+# /unit_test/test_command_queue.py
+
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from src.command_queue import CommandQueue, CommandQueueError, Lane, SafetyMonitor
+from src.config import SafetyLimits
+from src.enums import SupplyCommand
+
+
+class TestCommandQueue(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pipeline = MagicMock()
+        self.pipeline.driver.name = "A"
+        self.order = []
+        self.gate = threading.Event()
+        self.busy = threading.Event()
+
+        def execute(cmd, value=None, channel=None, expect_response=None):
+            if cmd == SupplyCommand.IDN:
+                self.busy.set()
+                self.gate.wait(2.0)
+            self.order.append(cmd)
+            return "OK"
+
+        self.pipeline.execute.side_effect = execute
+        self.q = CommandQueue(self.pipeline)
+        self.q.start()
+
+    def tearDown(self) -> None:
+        self.gate.set()
+        self.q.stop(timeout_s=2.0)
+
+    def test_emergency_jumps_ahead_of_normal_work(self):
+        first = self.q.submit(SupplyCommand.IDN)          # occupies the port
+        self.busy.wait(2.0)
+        normal = [self.q.submit(SupplyCommand.SET_VOLTAGE, value=float(v)) for v in range(3)]
+        safety = self.q.submit(SupplyCommand.MEASURE_VOLTAGE, lane=Lane.SAFETY)
+        emergency = self.q.submit(SupplyCommand.CLOSE_OUTPUT)
+        self.gate.set()
+
+        for f in [first, *normal, safety, emergency]:
+            self.assertEqual(f.result(2.0), "OK")
+
+        self.assertEqual(self.order[:3], [SupplyCommand.IDN, SupplyCommand.CLOSE_OUTPUT, SupplyCommand.MEASURE_VOLTAGE])
+        self.assertEqual(self.order[3:], [SupplyCommand.SET_VOLTAGE] * 3)
+
+    def test_execute_returns_result_and_propagates_errors(self):
+        self.gate.set()
+        self.assertEqual(self.q.execute(SupplyCommand.MEASURE_CURRENT), "OK")
+
+        self.pipeline.execute.side_effect = RuntimeError("boom")
+        with self.assertRaises(RuntimeError):
+            self.q.execute(SupplyCommand.MEASURE_CURRENT)
+
+    def test_trip_rejects_normal_work_until_reset(self):
+        self.gate.set()
+        self.q.trip("over-current")
+
+        with self.assertRaises(CommandQueueError):
+            self.q.submit(SupplyCommand.OPEN_OUTPUT)
+        self.assertEqual(self.q.execute(SupplyCommand.CLOSE_OUTPUT), "OK")
+        self.assertEqual(self.q.submit(SupplyCommand.MEASURE_VOLTAGE, lane=Lane.SAFETY).result(2.0), "OK")
+
+        self.q.reset_trip()
+        self.assertEqual(self.q.execute(SupplyCommand.OPEN_OUTPUT), "OK")
+
+    def test_normal_work_queued_before_trip_is_dropped(self):
+        first = self.q.submit(SupplyCommand.IDN)
+        self.busy.wait(2.0)
+        queued = self.q.submit(SupplyCommand.OPEN_OUTPUT)
+        self.q.trip("over-voltage")
+        self.gate.set()
+
+        self.assertEqual(first.result(2.0), "OK")
+        with self.assertRaises(CommandQueueError):
+            queued.result(2.0)
+        self.assertNotIn(SupplyCommand.OPEN_OUTPUT, self.order)
+
+    def test_tracks_output_state(self):
+        self.gate.set()
+        self.assertFalse(self.q.output_on)
+
+        self.q.execute(SupplyCommand.OPEN_OUTPUT)
+        self.assertTrue(self.q.output_on)
+        self.q.execute(SupplyCommand.CLOSE_OUTPUT)
+        self.assertFalse(self.q.output_on)
+
+    def test_query_timed_goes_through_worker(self):
+        self.gate.set()
+        self.pipeline.query_timed.return_value = "TIMED"
+
+        self.assertEqual(self.q.query_timed(SupplyCommand.MEASURE_VOLTAGE), "TIMED")
+        self.pipeline.query_timed.assert_called_once_with(SupplyCommand.MEASURE_VOLTAGE, channel=None, settle_s=0.0)
+
+    def test_submit_requires_running_queue(self):
+        self.gate.set()
+        self.q.stop(timeout_s=2.0)
+        with self.assertRaises(CommandQueueError):
+            self.q.submit(SupplyCommand.IDN)
+
+
+class TestSafetyMonitor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.q = MagicMock()
+        self.q.driver.name = "A"
+        self.q.output_on = False
+        self.q.output_on_since = None
+        self.readings = {SupplyCommand.MEASURE_VOLTAGE: "5.0", SupplyCommand.MEASURE_CURRENT: "0.1"}
+
+        def submit(cmd, lane=None, **kwargs):
+            fut = MagicMock()
+            fut.result.return_value = self.readings.get(cmd, "")
+            return fut
+
+        self.q.submit.side_effect = submit
+
+    def submitted(self):
+        return [c.args[0] for c in self.q.submit.call_args_list]
+
+    def test_within_limits_does_not_trip(self):
+        mon = SafetyMonitor(self.q, SafetyLimits(max_voltage=6.0, max_current=0.5))
+
+        self.assertIsNone(mon.check_once())
+        self.assertNotIn(SupplyCommand.CLOSE_OUTPUT, self.submitted())
+
+    def test_overcurrent_closes_output_and_reports(self):
+        trips = []
+        self.readings[SupplyCommand.MEASURE_CURRENT] = "0.9"
+        mon = SafetyMonitor(self.q, SafetyLimits(max_current=0.5), on_trip=trips.append)
+
+        trip = mon.check_once()
+
+        self.assertIsNotNone(trip)
+        self.assertEqual(trips, [trip])
+        self.assertEqual(self.submitted()[-1], SupplyCommand.CLOSE_OUTPUT)
+
+    def test_trip_latches_queue_before_closing_output(self):
+        self.readings[SupplyCommand.MEASURE_VOLTAGE] = "7.0"
+        mon = SafetyMonitor(self.q, SafetyLimits(max_voltage=6.0))
+
+        mon.check_once()
+
+        names = [c[0] for c in self.q.method_calls if c[0] in ("trip", "submit")]
+        self.assertEqual(names[-2:], ["trip", "submit"])
+        self.q.trip.assert_called_once()
+
+    def test_min_voltage_ignored_while_output_off(self):
+        self.readings[SupplyCommand.MEASURE_VOLTAGE] = "0.0"
+        mon = SafetyMonitor(self.q, SafetyLimits(min_voltage=4.5, period_s=0.5), clock=lambda: 10.0)
+
+        self.assertIsNone(mon.check_once())
+
+        # Output on, but still inside the ramp-up grace period
+        self.q.output_on = True
+        self.q.output_on_since = 9.8
+        self.assertIsNone(mon.check_once())
+
+        self.q.output_on_since = 9.0
+        self.assertIsNotNone(mon.check_once())
+
+    def test_reads_use_safety_lane(self):
+        mon = SafetyMonitor(self.q, SafetyLimits(max_voltage=6.0))
+        mon.check_once()
+
+        lanes = {c.args[0]: c.kwargs.get("lane") for c in self.q.submit.call_args_list}
+        self.assertEqual(lanes[SupplyCommand.MEASURE_VOLTAGE], Lane.SAFETY)
+        self.assertEqual(lanes[SupplyCommand.MEASURE_CURRENT], Lane.SAFETY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+# /unit_test/test_hot_reload.py
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.drivers.factory import create_driver
+from src.enums import SupplyCommand
+from src.hot_reload import ConfigWatcher, LiveSupply, diff_profiles
+from src.pipeline import SupplyPipeline
+from src.supply_config import load_supply_profiles
+
+
+CONFIG = {
+    "default": "A",
+    "supplies": {
+        "A": {
+            "driver": "map",
+            "serial": {"baudrate": 9600, "timeout_s": 1.5},
+            "command_map": {"IDN": "*IDN?", "SET_VOLTAGE": "VOLT {value}"},
+            "expect_response": ["IDN"],
+        },
+        "B": {
+            "driver": "map",
+            "serial": {"baudrate": 9600, "stopbits": 2},
+            "command_map": {"IDN": "*IDN?"},
+        },
+    },
+}
+
+
+class TestHotReload(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "power_supplies.json")
+        self.write(CONFIG)
+
+        _, profiles = load_supply_profiles(self.path)
+        self.transport = MagicMock()
+        self.pipeline = SupplyPipeline(transport=self.transport, driver=create_driver(profiles["A"]))
+        self.live = LiveSupply(profile=profiles["A"], port="COM4", pipeline=self.pipeline)
+        self.watcher = ConfigWatcher(self.path, {"dut": self.live}, poll_s=0.01)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def write(self, cfg) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(cfg, f)
+        # Make sure the stamp changes even on coarse-mtime filesystems
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def edited(self, **changes):
+        cfg = json.loads(json.dumps(CONFIG))
+        for key, value in changes.items():
+            cfg["supplies"]["A"][key] = value
+        return cfg
+
+    def test_unchanged_file_is_not_reloaded(self):
+        self.assertIsNone(self.watcher.check())
+
+    def test_command_map_change_swaps_driver_without_reopening(self):
+        old_driver = self.pipeline.driver
+        self.write(self.edited(command_map={"IDN": "*IDN?", "SET_VOLTAGE": "SOUR:VOLT {value}"}))
+
+        diff = self.watcher.check()
+
+        self.assertEqual(diff.driver_changed, ("A",))
+        self.assertIsNot(self.pipeline.driver, old_driver)
+        self.assertEqual(self.pipeline.driver.build_command(SupplyCommand.SET_VOLTAGE, value=5.0), "SOUR:VOLT 5.000")
+        self.transport.close.assert_not_called()
+        self.transport.open.assert_not_called()
+
+    def test_serial_change_reopens_port_keeping_runtime_port(self):
+        self.write(self.edited(serial={"baudrate": 19200, "timeout_s": 1.5}))
+
+        diff = self.watcher.check()
+
+        self.assertEqual(diff.link_changed, ("A",))
+        self.transport.close.assert_called_once()
+        self.transport.open.assert_called_once()
+        self.assertEqual(self.transport.cfg.baudrate, 19200)
+        self.assertEqual(self.transport.cfg.port, "COM4")
+
+    def test_other_profile_change_leaves_live_supply_alone(self):
+        cfg = json.loads(json.dumps(CONFIG))
+        cfg["supplies"]["B"]["serial"]["baudrate"] = 4800
+        old_driver = self.pipeline.driver
+        self.write(cfg)
+
+        diff = self.watcher.check()
+
+        self.assertEqual(diff.link_changed, ("B",))
+        self.assertIs(self.pipeline.driver, old_driver)
+        self.transport.close.assert_not_called()
+
+    def test_invalid_config_keeps_running_profile(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{ not json")
+        st = os.stat(self.path)
+        os.utime(self.path, ns=(st.st_atime_ns, st.st_mtime_ns + 2_000_000_000))
+
+        self.assertIsNone(self.watcher.check())
+        self.assertEqual(self.live.profile.command_map_raw["SET_VOLTAGE"], "VOLT {value}")
+
+    def test_unknown_command_name_rejects_whole_reload(self):
+        old_driver = self.pipeline.driver
+        self.write(self.edited(
+            command_map={"IDN": "*IDN?", "BOGUS": "X"},
+            serial={"baudrate": 19200, "timeout_s": 1.5},
+        ))
+
+        self.assertIsNone(self.watcher.check())
+
+        # Neither half of the edit was applied
+        self.assertIs(self.pipeline.driver, old_driver)
+        self.transport.close.assert_not_called()
+        self.assertEqual(self.live.profile.serial.baudrate, 9600)
+
+        self.write(self.edited(serial={"baudrate": 19200, "timeout_s": 1.5}))
+        diff = self.watcher.check()
+        self.assertEqual(diff.link_changed, ("A",))
+        self.assertEqual(self.transport.cfg.baudrate, 19200)
+
+    def test_failed_reload_is_retried_without_a_new_edit(self):
+        self.write(self.edited(command_map={"IDN": "*IDN?", "SET_VOLTAGE": "SOUR:VOLT {value}"}))
+
+        with patch("src.hot_reload.create_driver", side_effect=ValueError("busy")):
+            self.assertIsNone(self.watcher.check())
+        diff = self.watcher.check()
+
+        self.assertEqual(diff.driver_changed, ("A",))
+        self.assertEqual(self.pipeline.driver.build_command(SupplyCommand.SET_VOLTAGE, value=5.0), "SOUR:VOLT 5.000")
+
+    def test_diff_profiles_reports_added_and_removed(self):
+        _, old = load_supply_profiles(self.path)
+        new = dict(old)
+        del new["B"]
+        new["C"] = old["B"]
+
+        diff = diff_profiles(old, new)
+
+        self.assertEqual(diff.added, ("C",))
+        self.assertEqual(diff.removed, ("B",))
+
+
+if __name__ == "__main__":
+    unittest.main()
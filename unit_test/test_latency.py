@@ -0,0 +1,152 @@
+# /unit_test/test_latency.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.config import SerialConfig
+from src.drivers.map_driver import MapBasedDriver
+from src.enums import SupplyCommand
+from src.latency import DEFAULT_SETTLE_S, LatencyError, LatencyTracker, latency_path_for, percentile
+from src.pipeline import SupplyPipeline
+from src.transport import SerialTransport, TimedResponse
+
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_percentile_nearest_rank(self):
+        values = sorted(float(i) for i in range(1, 101))
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile(values, 5), 5.0)
+        self.assertEqual(percentile([0.3], 50), 0.3)
+
+    def test_defaults_until_min_samples(self):
+        tr = LatencyTracker(min_samples=3)
+        tr.record("A", "IDN", 0.02)
+        tr.record("A", "IDN", 0.02)
+
+        timing = tr.timing("A", "IDN")
+
+        self.assertIsNone(timing.settle_s)
+        self.assertIsNone(timing.timeout_s)
+
+    def test_fast_and_slow_commands_get_separate_timings(self):
+        tr = LatencyTracker(min_samples=3, margin_ratio=0.5, margin_s=0.0, min_timeout_s=0.0)
+        for _ in range(10):
+            tr.record("A", "IDN", 0.010)
+            tr.record("A", "RESET", 1.2)
+
+        fast = tr.timing("A", "IDN")
+        slow = tr.timing("A", "RESET")
+
+        self.assertAlmostEqual(fast.timeout_s, 0.015)
+        self.assertAlmostEqual(fast.settle_s, 0.005)
+        self.assertAlmostEqual(slow.timeout_s, 1.8)
+        self.assertEqual(slow.settle_s, DEFAULT_SETTLE_S)
+
+    def test_timeout_is_clamped(self):
+        tr = LatencyTracker(min_samples=1, max_timeout_s=2.0)
+        tr.record("A", "RESET", 30.0)
+        self.assertEqual(tr.timing("A", "RESET").timeout_s, 2.0)
+
+    def test_window_drops_old_samples(self):
+        tr = LatencyTracker(window=3)
+        for x in (5.0, 0.1, 0.1, 0.1):
+            tr.record("A", "IDN", x)
+        self.assertEqual(tr.samples("A", "IDN"), [0.1, 0.1, 0.1])
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = os.path.join(tmp, "power_supplies.json")
+            path = latency_path_for(cfg)
+            self.assertEqual(path.name, "power_supplies.latency.json")
+
+            tr = LatencyTracker(min_samples=1)
+            tr.record("B", "MEASURE_VOLTAGE", 0.25)
+            tr.save(path)
+
+            loaded = LatencyTracker(min_samples=1)
+            loaded.load(path)
+            self.assertEqual(loaded.samples("B", "MEASURE_VOLTAGE"), [0.25])
+            self.assertEqual(loaded.timing("B", "MEASURE_VOLTAGE"), tr.timing("B", "MEASURE_VOLTAGE"))
+
+    def test_load_missing_file_is_noop_and_bad_file_raises(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            tr = LatencyTracker()
+            tr.load(os.path.join(tmp, "nope.latency.json"))
+
+            bad = os.path.join(tmp, "bad.latency.json")
+            with open(bad, "w", encoding="utf-8") as f:
+                f.write("{}")
+            with self.assertRaises(LatencyError):
+                tr.load(bad)
+
+
+class TestPipelineLearnedTiming(unittest.TestCase):
+    def setUp(self) -> None:
+        self.transport = MagicMock()
+        self.driver = MapBasedDriver(
+            driver_name="A",
+            command_map={SupplyCommand.IDN: "*IDN?"},
+            expect_response_set={SupplyCommand.IDN},
+        )
+        self.tracker = LatencyTracker(min_samples=2, margin_ratio=0.0, margin_s=0.0, min_timeout_s=0.0)
+        self.pipeline = SupplyPipeline(transport=self.transport, driver=self.driver, latency=self.tracker)
+
+    def test_records_latency_then_uses_learned_values(self):
+        self.transport.send_and_receive_timed.return_value = TimedResponse("OK", 1.0, 1.04)
+
+        for _ in range(3):
+            self.assertEqual(self.pipeline.execute(SupplyCommand.IDN), "OK")
+
+        calls = self.transport.send_and_receive_timed.call_args_list
+        self.assertEqual(calls[0].kwargs, {"settle_s": None, "timeout_s": None})
+        self.assertAlmostEqual(calls[2].kwargs["timeout_s"], 0.04)
+        self.assertAlmostEqual(calls[2].kwargs["settle_s"], 0.02)
+        self.assertEqual(len(self.tracker.samples("A", "IDN")), 3)
+
+    def test_learned_timeout_hit_widens_next_timeout(self):
+        for _ in range(2):
+            self.tracker.record("A", "IDN", 0.04)
+        self.transport.send_and_receive_timed.return_value = TimedResponse("", 1.0, 1.06)
+
+        self.pipeline.execute(SupplyCommand.IDN)
+
+        self.assertGreater(self.tracker.timing("A", "IDN").timeout_s, 0.04)
+
+
+    def test_timeout_with_full_window_doubles_until_a_response(self):
+        for _ in range(self.tracker.window):
+            self.tracker.record("A", "IDN", 0.04)
+        self.transport.send_and_receive_timed.return_value = TimedResponse("", 1.0, 1.06)
+
+        self.pipeline.execute(SupplyCommand.IDN)
+        widened = self.tracker.timing("A", "IDN").timeout_s
+        self.pipeline.execute(SupplyCommand.IDN)
+
+        self.assertGreaterEqual(widened, 0.08)
+        self.assertGreaterEqual(self.tracker.timing("A", "IDN").timeout_s, 0.16)
+
+        self.transport.send_and_receive_timed.return_value = TimedResponse("OK", 1.0, 1.04)
+        self.pipeline.execute(SupplyCommand.IDN)
+        self.assertLess(self.tracker.timing("A", "IDN").timeout_s, 0.08)
+
+
+class TestTransportTimeoutOverride(unittest.TestCase):
+    def test_timeout_override_is_restored(self):
+        tr = SerialTransport(SerialConfig(port="COM_TEST"))
+        tr._ser = MagicMock()
+        tr._ser.is_open = True
+        tr._ser.timeout = 1.5
+        seen = []
+        tr._ser.readline.side_effect = lambda: seen.append(tr._ser.timeout) or b"OK\n"
+
+        resp = tr.send_and_receive("*IDN?", settle_s=0, timeout_s=0.2)
+
+        self.assertEqual(resp, "OK")
+        self.assertEqual(seen, [0.2])
+        self.assertEqual(tr._ser.timeout, 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+# /unit_test/test_measure_cache.py
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from src.enums import SupplyCommand
+from src.measure_cache import CachedPipeline, MeasurementCache
+from src.pipeline import SupplyPipeline
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_pipeline(name="A", response="5.000"):
+    transport = MagicMock()
+    transport.send_and_receive.return_value = response
+    driver = MagicMock()
+    driver.name = name
+    driver.build_command.side_effect = lambda cmd, value=None, channel=None: f"{cmd.name} {value} {channel}"
+    driver.expects_response.side_effect = lambda cmd: cmd.name.startswith("MEASURE") or cmd == SupplyCommand.IDN
+    return SupplyPipeline(transport=transport, driver=driver), transport
+
+
+class TestMeasurementCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.pipeline, self.transport = make_pipeline()
+        self.cache = MeasurementCache(ttl_s=0.5, clock=self.clock)
+
+    def queries(self, transport=None):
+        return (transport or self.transport).send_and_receive.call_count
+
+    def test_fresh_value_is_served_from_cache(self):
+        self.assertEqual(self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE), "5.000")
+        self.clock.now = 0.4
+        self.assertEqual(self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE), "5.000")
+
+        self.assertEqual(self.queries(), 1)
+        self.assertEqual(self.cache.stats.hits, 1)
+
+    def test_expired_value_is_requeried(self):
+        self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE)
+        self.clock.now = 0.6
+        self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE)
+
+        self.assertEqual(self.queries(), 2)
+
+    def test_key_includes_channel(self):
+        self.cache.execute(self.pipeline, SupplyCommand.MEASURE_RAIL_VOLTAGE, channel=1)
+        self.cache.execute(self.pipeline, SupplyCommand.MEASURE_RAIL_VOLTAGE, channel=2)
+
+        self.assertEqual(self.queries(), 2)
+
+    def test_supplies_sharing_a_profile_do_not_share_entries(self):
+        other, other_transport = make_pipeline(name="A", response="12.000")
+
+        self.assertEqual(self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE), "5.000")
+        self.assertEqual(self.cache.execute(other, SupplyCommand.MEASURE_VOLTAGE), "12.000")
+
+        self.pipeline.execute(SupplyCommand.SET_VOLTAGE, value=6.0)
+        self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE)
+        self.cache.execute(other, SupplyCommand.MEASURE_VOLTAGE)
+
+        self.assertEqual(self.queries(), 2)
+        self.assertEqual(self.queries(other_transport), 1)
+
+    def test_write_bypassing_the_cache_invalidates(self):
+        self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE)
+        self.pipeline.execute(SupplyCommand.CLOSE_OUTPUT)
+        self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE)
+
+        self.assertEqual(self.queries(), 2)
+
+    def test_idn_does_not_invalidate(self):
+        self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE)
+        self.cache.execute(self.pipeline, SupplyCommand.IDN)
+        self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE)
+
+        self.assertEqual(self.queries(), 2)
+
+    def test_concurrent_callers_share_one_query(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_query(line):
+            started.set()
+            release.wait(2.0)
+            return "1.234"
+
+        self.transport.send_and_receive.side_effect = slow_query
+        results = []
+
+        def reader():
+            results.append(self.cache.execute(self.pipeline, SupplyCommand.MEASURE_CURRENT))
+
+        leader = threading.Thread(target=reader)
+        leader.start()
+        started.wait(2.0)
+        followers = [threading.Thread(target=reader) for _ in range(4)]
+        for t in followers:
+            t.start()
+        deadline = time.monotonic() + 2.0
+        while self.cache.stats.coalesced < 4 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        for t in [leader, *followers]:
+            t.join(2.0)
+
+        self.assertEqual(self.queries(), 1)
+        self.assertEqual(results, ["1.234"] * 5)
+
+    def test_error_is_shared_and_not_cached(self):
+        self.transport.send_and_receive.side_effect = [RuntimeError("port gone"), "5.000"]
+
+        with self.assertRaises(RuntimeError):
+            self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE)
+        self.assertEqual(self.cache.execute(self.pipeline, SupplyCommand.MEASURE_VOLTAGE), "5.000")
+
+    def test_cached_pipeline_send_line_invalidates(self):
+        cached = CachedPipeline(self.pipeline, self.cache)
+        cached.execute(SupplyCommand.MEASURE_VOLTAGE)
+        cached.send_line("APPL P6V,5.000,0.500", expect_response=False)
+        cached.execute(SupplyCommand.MEASURE_VOLTAGE)
+
+        self.assertEqual(self.queries(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
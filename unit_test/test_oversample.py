@@ -0,0 +1,122 @@
+# /unit_test/test_oversample.py
+
+import unittest
+from unittest.mock import MagicMock
+
+from src.drivers.map_driver import MapBasedDriver
+from src.enums import SupplyCommand
+from src.oversample import OversampleError, RunningStats, measure_adaptive, reading_resolution
+from src.pipeline import SupplyPipeline
+
+
+def make_pipeline(responses, compound=False):
+    transport = MagicMock()
+    transport.send_and_receive.side_effect = list(responses)
+    driver = MapBasedDriver(
+        driver_name="A",
+        command_map={SupplyCommand.MEASURE_VOLTAGE: "MEAS:VOLT?"},
+        expect_response_set={SupplyCommand.MEASURE_VOLTAGE},
+        compound=compound,
+    )
+    return SupplyPipeline(transport=transport, driver=driver), transport
+
+
+class TestRunningStats(unittest.TestCase):
+    def test_matches_two_pass_formula(self):
+        data = [4.98, 5.01, 5.00, 5.03, 4.99]
+        rs = RunningStats()
+        for x in data:
+            rs.add(x)
+
+        mean = sum(data) / len(data)
+        var = sum((x - mean) ** 2 for x in data) / (len(data) - 1)
+        self.assertAlmostEqual(rs.mean, mean)
+        self.assertAlmostEqual(rs.std ** 2, var)
+
+
+class TestMeasureAdaptive(unittest.TestCase):
+    def test_stable_signal_stops_at_min_samples(self):
+        pipeline, transport = make_pipeline(["5.000"] * 10)
+
+        res = measure_adaptive(pipeline, tolerance=0.001, min_samples=3, max_samples=10)
+
+        self.assertTrue(res.converged)
+        self.assertEqual(res.count, 3)
+        self.assertEqual(transport.send_and_receive.call_count, 3)
+        self.assertAlmostEqual(res.mean, 5.0)
+
+    def test_identical_quantized_readings_do_not_fake_convergence(self):
+        pipeline, _ = make_pipeline(["5.000"] * 10)
+
+        res = measure_adaptive(pipeline, tolerance=0.0001, min_samples=3, max_samples=10)
+
+        self.assertFalse(res.converged)
+        self.assertEqual(res.count, 10)
+        self.assertAlmostEqual(res.resolution, 0.001)
+        self.assertGreater(res.sem, 0.0)
+
+    def test_sem_never_drops_below_quantization_noise(self):
+        pipeline, _ = make_pipeline(["5.000"] * 50)
+
+        res = measure_adaptive(pipeline, tolerance=0.0002, min_samples=3, max_samples=50)
+
+        self.assertFalse(res.converged)
+        self.assertEqual(res.count, 50)
+        self.assertAlmostEqual(res.sem, 0.001 / 12 ** 0.5)
+
+    def test_single_reads_go_through_the_mapped_command(self):
+        pipeline, transport = make_pipeline(["5.000"] * 3)
+        sent = []
+        pipeline.add_send_listener(lambda _p, cmd: sent.append(cmd))
+
+        measure_adaptive(pipeline, tolerance=0.001, min_samples=3, max_samples=3)
+
+        # A raw send_line would report cmd None, which a measurement cache treats as a write
+        self.assertEqual(sent, [SupplyCommand.MEASURE_VOLTAGE] * 3)
+        transport.send_and_receive.assert_called_with("MEAS:VOLT?")
+
+    def test_one_count_step_is_not_an_outlier(self):
+        pipeline, _ = make_pipeline(["5.000", "5.000", "5.000", "5.001", "5.000"])
+
+        res = measure_adaptive(pipeline, tolerance=0.0001, min_samples=3, max_samples=5)
+
+        self.assertEqual(res.rejected, 0)
+
+    def test_reading_resolution(self):
+        self.assertAlmostEqual(reading_resolution("5.000"), 0.001)
+        self.assertAlmostEqual(reading_resolution("+5.00000000E+00"), 1e-8)
+        self.assertEqual(reading_resolution("junk"), 0.0)
+
+    def test_noisy_signal_uses_budget(self):
+        pipeline, _ = make_pipeline(["4.9", "5.1"] * 5)
+
+        res = measure_adaptive(pipeline, tolerance=0.001, min_samples=3, max_samples=10)
+
+        self.assertFalse(res.converged)
+        self.assertEqual(res.count + res.rejected, 10)
+
+    def test_outlier_and_garbage_are_rejected(self):
+        pipeline, _ = make_pipeline(["5.000", "5.001", "4.999", "", "9.000", "5.000", "5.000"])
+
+        res = measure_adaptive(pipeline, tolerance=0.0001, min_samples=3, max_samples=7)
+
+        self.assertEqual(res.rejected, 2)
+        self.assertAlmostEqual(res.mean, 5.0, places=3)
+
+    def test_compound_batches_readings_per_round_trip(self):
+        pipeline, transport = make_pipeline(["5.000;5.000;5.000;5.000"], compound=True)
+
+        res = measure_adaptive(pipeline, min_samples=3, max_samples=20, batch_size=4)
+
+        transport.send_and_receive.assert_called_once_with("MEAS:VOLT?;:MEAS:VOLT?;:MEAS:VOLT?;:MEAS:VOLT?")
+        self.assertEqual(res.queries, 1)
+        self.assertEqual(res.count, 4)
+
+    def test_no_valid_readings_raises(self):
+        pipeline, _ = make_pipeline([""] * 3)
+        with self.assertRaises(OversampleError):
+            measure_adaptive(pipeline, min_samples=2, max_samples=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
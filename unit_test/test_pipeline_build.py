@@ -80,5 +80,45 @@ class TestMapBasedDriverBuildCommand(unittest.TestCase):
         self.assertFalse(self.driver.expects_response(SupplyCommand.RESET))
 
 
+class TestMapBasedDriverRails(unittest.TestCase):
+    def setUp(self) -> None:
+        self.driver = MapBasedDriver(
+            driver_name="B",
+            command_map={
+                SupplyCommand.APPLY: "APPL {rail},{value},{current}",
+                SupplyCommand.MEASURE_RAIL_VOLTAGE: "MEAS:VOLT? {rail}",
+                SupplyCommand.OPEN_OUTPUT: "OUTP ON",
+                SupplyCommand.IDN: "*IDN?",
+            },
+            expect_response_set=set(),
+            rail_names=("P6V", "P25V", "N25V"),
+            compound=True,
+        )
+
+    def test_apply_formats_rail_value_current(self):
+        self.assertEqual(
+            self.driver.build_command(SupplyCommand.APPLY, value=-12.0, channel=3, current=0.1),
+            "APPL N25V,-12.000,0.100",
+        )
+
+    def test_apply_requires_current(self):
+        with self.assertRaises(DriverConfigError):
+            self.driver.build_command(SupplyCommand.APPLY, value=5.0, channel=1)
+
+    def test_rail_requires_known_channel(self):
+        with self.assertRaises(DriverConfigError):
+            self.driver.build_command(SupplyCommand.MEASURE_RAIL_VOLTAGE, channel=4)
+
+    def test_build_compound_roots_subsystem_commands(self):
+        self.assertEqual(
+            self.driver.build_compound(["APPL P6V,5.000,0.500", "OUTP ON", "*IDN?"]),
+            "APPL P6V,5.000,0.500;:OUTP ON;*IDN?",
+        )
+
+    def test_supports(self):
+        self.assertTrue(self.driver.supports(SupplyCommand.APPLY))
+        self.assertFalse(self.driver.supports(SupplyCommand.SET_VOLTAGE))
+
+
 if __name__ == "__main__":
     unittest.main()
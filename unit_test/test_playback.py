@@ -0,0 +1,112 @@
+# /unit_test/test_playback.py
+
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.drivers.map_driver import MapBasedDriver
+from src.enums import SupplyCommand
+from src.pipeline import SupplyPipeline
+from src.playback import PlaybackError, WaveformPlayer, WaveformPoint, load_waveform, waveform_from_rows
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, s: float) -> None:
+        # A zero sleep (spin phase) still lets some time pass
+        self.now += max(s, 0.0001)
+
+
+def make_pipeline(fake: FakeTime, write_cost_s: float, compound: bool = False):
+    transport = MagicMock()
+    transport.write_line.side_effect = lambda line: setattr(fake, "now", fake.now + write_cost_s)
+    driver = MapBasedDriver(
+        driver_name="A",
+        command_map={SupplyCommand.SET_VOLTAGE: "VOLT {value}", SupplyCommand.SET_CURRENT: "CURR {value}"},
+        expect_response_set=set(),
+        compound=compound,
+    )
+    return SupplyPipeline(transport=transport, driver=driver), transport
+
+
+class TestWaveformLoading(unittest.TestCase):
+    def test_csv_with_time_column(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "crank.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("t_s,voltage,current\n0,12.0,1.0\n0.01,6.0,\n0.02,12.0,\n")
+
+            pts = load_waveform(path)
+
+        self.assertEqual(pts[1], WaveformPoint(t_s=0.01, voltage=6.0, current=None))
+
+    def test_rows_with_rate(self):
+        pts = waveform_from_rows([(5.0,), (5.5,)], rate_hz=100.0)
+        self.assertEqual([p.t_s for p in pts], [0.0, 0.01])
+
+    def test_scalar_rows_with_rate(self):
+        pts = waveform_from_rows([5.0, 6.0], rate_hz=10.0)
+        self.assertEqual(pts[1], WaveformPoint(t_s=0.1, voltage=6.0, current=None))
+
+    def test_scalar_rows_without_rate_are_rejected(self):
+        with self.assertRaises(PlaybackError):
+            waveform_from_rows([5.0, 6.0])
+
+    def test_time_must_not_go_backwards(self):
+        with self.assertRaises(PlaybackError):
+            waveform_from_rows([(0.1, 5.0), (0.0, 5.0)])
+
+
+class TestWaveformPlayer(unittest.TestCase):
+    def test_on_time_playback_sends_every_point(self):
+        fake = FakeTime()
+        pipeline, transport = make_pipeline(fake, write_cost_s=0.001)
+        pts = waveform_from_rows([(5.0,), (6.0,), (7.0,)], rate_hz=100.0)
+
+        player = WaveformPlayer(pipeline, clock=fake.clock, sleep=fake.sleep)
+        report = player.play(pts)
+
+        lines = [c.args[0] for c in transport.write_line.call_args_list]
+        self.assertEqual(lines, ["VOLT 5.000", "VOLT 6.000", "VOLT 7.000"])
+        self.assertEqual(report.missed_deadlines, 0)
+        # The fake clock advances 0.1 ms per spin, so a step may land just after its deadline
+        self.assertLess(report.max_jitter_s, player.spin_s)
+
+    def test_late_points_are_merged(self):
+        fake = FakeTime()
+        # Each write takes 25 ms but points are 10 ms apart
+        pipeline, transport = make_pipeline(fake, write_cost_s=0.025)
+        pts = waveform_from_rows([(float(v),) for v in range(6)], rate_hz=100.0)
+
+        report = WaveformPlayer(pipeline, clock=fake.clock, sleep=fake.sleep).play(pts)
+
+        lines = [c.args[0] for c in transport.write_line.call_args_list]
+        self.assertEqual(lines[0], "VOLT 0.000")
+        self.assertEqual(lines[-1], "VOLT 5.000")
+        self.assertLess(report.steps, 6)
+        self.assertEqual(report.steps + report.skipped + report.deduped, 6)
+        self.assertGreater(report.missed_deadlines, 0)
+
+    def test_unchanged_values_are_not_resent_and_compound_is_used(self):
+        fake = FakeTime()
+        pipeline, transport = make_pipeline(fake, write_cost_s=0.0, compound=True)
+        pts = [WaveformPoint(0.0, 12.0, 1.0), WaveformPoint(0.01, 12.0, 1.0), WaveformPoint(0.02, 6.0, None)]
+
+        report = WaveformPlayer(pipeline, clock=fake.clock, sleep=fake.sleep).play(pts)
+
+        lines = [c.args[0] for c in transport.write_line.call_args_list]
+        self.assertEqual(lines, ["VOLT 12.000;:CURR 1.000", "VOLT 6.000"])
+        self.assertEqual(report.steps, 2)
+        self.assertEqual(report.deduped, 1)
+        self.assertEqual(report.steps + report.skipped + report.deduped, report.points)
+        self.assertGreater(report.achieved_rate_hz, report.write_rate_hz)
+
+
+if __name__ == "__main__":
+    unittest.main()
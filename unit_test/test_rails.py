@@ -0,0 +1,100 @@
+# /unit_test/test_rails.py
+
+import unittest
+from unittest.mock import MagicMock
+
+from src.drivers.map_driver import MapBasedDriver
+from src.enums import SupplyCommand
+from src.pipeline import SupplyPipeline
+from src.rails import MultiRailBatch, RailBatchError, RailSetpoint
+
+
+def make_driver(compound: bool, apply: bool = True) -> MapBasedDriver:
+    command_map = {
+        SupplyCommand.SELECT_P6V: "INST:SEL P6V",
+        SupplyCommand.SELECT_P25V: "INST:SEL P25V",
+        SupplyCommand.SELECT_N25V: "INST:SEL N25V",
+        SupplyCommand.SET_VOLTAGE: "VOLT {value}",
+        SupplyCommand.SET_CURRENT: "CURR {value}",
+        SupplyCommand.OPEN_OUTPUT: "OUTP ON",
+        SupplyCommand.MEASURE_VOLTAGE: "MEAS:VOLT?",
+        SupplyCommand.MEASURE_CURRENT: "MEAS:CURR?",
+    }
+    if apply:
+        command_map[SupplyCommand.APPLY] = "APPL {rail},{value},{current}"
+        command_map[SupplyCommand.MEASURE_RAIL_VOLTAGE] = "MEAS:VOLT? {rail}"
+        command_map[SupplyCommand.MEASURE_RAIL_CURRENT] = "MEAS:CURR? {rail}"
+
+    return MapBasedDriver(
+        driver_name="B",
+        command_map=command_map,
+        expect_response_set=set(),
+        rail_names=("P6V", "P25V", "N25V"),
+        compound=compound,
+    )
+
+
+class TestMultiRailBatch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.transport = MagicMock()
+        self.setpoints = [
+            RailSetpoint("P6V", 5.0, 0.5),
+            RailSetpoint("P25V", 12.0, 0.2),
+            RailSetpoint("N25V", -12.0, 0.2),
+        ]
+
+    def test_program_compound_apply_is_single_write(self):
+        batch = MultiRailBatch(SupplyPipeline(transport=self.transport, driver=make_driver(compound=True)))
+
+        batch.program(self.setpoints, output_on=True)
+
+        self.transport.write_line.assert_called_once_with(
+            "APPL P6V,5.000,0.500;:APPL P25V,12.000,0.200;:APPL N25V,-12.000,0.200;:OUTP ON"
+        )
+
+    def test_program_without_apply_falls_back_to_select(self):
+        batch = MultiRailBatch(SupplyPipeline(transport=self.transport, driver=make_driver(compound=False, apply=False)))
+
+        batch.program(self.setpoints[:1])
+
+        lines = [c.args[0] for c in self.transport.write_line.call_args_list]
+        self.assertEqual(lines, ["INST:SEL P6V", "VOLT 5.000", "CURR 0.500"])
+
+    def test_measure_compound_is_single_query(self):
+        self.transport.send_and_receive.return_value = "5.001;0.100;12.000;0.050;-11.990;0.010"
+        batch = MultiRailBatch(SupplyPipeline(transport=self.transport, driver=make_driver(compound=True)))
+
+        readings = batch.measure()
+
+        self.transport.send_and_receive.assert_called_once_with(
+            "MEAS:VOLT? P6V;:MEAS:CURR? P6V;:MEAS:VOLT? P25V;:MEAS:CURR? P25V;:MEAS:VOLT? N25V;:MEAS:CURR? N25V"
+        )
+        self.assertEqual(list(readings), ["P6V", "P25V", "N25V"])
+        self.assertAlmostEqual(readings["N25V"].voltage, -11.99)
+        self.assertAlmostEqual(readings["P25V"].current, 0.05)
+
+    def test_measure_compound_field_count_mismatch_raises(self):
+        self.transport.send_and_receive.return_value = "5.001;0.100"
+        batch = MultiRailBatch(SupplyPipeline(transport=self.transport, driver=make_driver(compound=True)))
+
+        with self.assertRaises(RailBatchError):
+            batch.measure(["P6V", "P25V"])
+
+    def test_measure_without_compound_selects_each_rail(self):
+        self.transport.send_and_receive.side_effect = ["5.0", "0.1"]
+        batch = MultiRailBatch(SupplyPipeline(transport=self.transport, driver=make_driver(compound=False, apply=False)))
+
+        readings = batch.measure(["P25V"])
+
+        self.transport.write_line.assert_called_once_with("INST:SEL P25V")
+        self.assertEqual(readings["P25V"].voltage, 5.0)
+        self.assertEqual(readings["P25V"].current, 0.1)
+
+    def test_unknown_rail_raises(self):
+        batch = MultiRailBatch(SupplyPipeline(transport=self.transport, driver=make_driver(compound=True)))
+        with self.assertRaises(RailBatchError):
+            batch.program([RailSetpoint("P12V", 1.0, 0.1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
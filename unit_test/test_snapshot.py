@@ -0,0 +1,145 @@
+# /unit_test/test_snapshot.py
+
+import unittest
+from dataclasses import replace
+from unittest.mock import MagicMock
+
+from src.drivers.factory import create_driver
+from src.enums import SupplyCommand
+from src.pipeline import SupplyPipeline
+from src.snapshot import SupplyState, TargetConfig, apply_target, plan_commands, read_snapshot
+from src.supply_config import load_supply_profiles
+
+
+_, PROFILES = load_supply_profiles("power_supplies.json")
+
+A_RESPONSE = (
+    "Agilent Technologies,E3645A,0,1.7-5.0-1.0;+5.00000000E+00;+2.00000000E-01;0;"
+    "+6.00000000E+00;1;0;P35V"
+)
+
+A_TARGET = TargetConfig(voltage=5.0, current=0.2, output_on=True, range_mode="low", ovp=6.0, ovp_enabled=True)
+
+
+def make_pipeline(name: str, compound: bool = True):
+    transport = MagicMock()
+    profile = replace(PROFILES[name], compound=compound)
+    return SupplyPipeline(transport=transport, driver=create_driver(profile)), transport
+
+
+class TestReadSnapshot(unittest.TestCase):
+    def test_compound_snapshot_is_single_query(self):
+        pipeline, transport = make_pipeline("A")
+        transport.send_and_receive.return_value = A_RESPONSE
+
+        state = read_snapshot(pipeline)
+
+        transport.send_and_receive.assert_called_once_with(
+            "*IDN?;:VOLT?;:CURR?;:OUTP?;:VOLT:PROT?;:VOLT:PROT:STAT?;:VOLT:PROT:TRIP?;:VOLT:RANG?"
+        )
+        self.assertEqual(state.idn, "Agilent Technologies,E3645A,0,1.7-5.0-1.0")
+        self.assertEqual(state.voltage, 5.0)
+        self.assertEqual(state.current, 0.2)
+        self.assertIs(state.output_on, False)
+        self.assertEqual(state.ovp, 6.0)
+        self.assertIs(state.ovp_enabled, True)
+        self.assertIs(state.ovp_tripped, False)
+        self.assertEqual(state.range, "P35V")
+        self.assertIsNone(state.rail)
+
+    def test_short_compound_response_falls_back_to_per_query(self):
+        pipeline, transport = make_pipeline("B")
+        transport.send_and_receive.side_effect = ["garbled", "HP,E3631A,0,2.1-5.0-1.0", "+5.0", "+0.5", "1", "P25V"]
+
+        state = read_snapshot(pipeline)
+
+        self.assertEqual(transport.send_and_receive.call_count, 6)
+        self.assertEqual(state.rail, "P25V")
+        self.assertIs(state.output_on, True)
+
+    def test_without_compound_each_field_is_queried(self):
+        pipeline, transport = make_pipeline("B", compound=False)
+        transport.send_and_receive.side_effect = ["HP,E3631A", "+5.0", "+0.5", "0", "P6V"]
+
+        state = read_snapshot(pipeline)
+
+        sent = [c.args[0] for c in transport.send_and_receive.call_args_list]
+        self.assertEqual(sent, ["*IDN?", "VOLT?", "CURR?", "OUTP?", "INST:SEL?"])
+        self.assertEqual(state.voltage, 5.0)
+
+
+class TestPlanCommands(unittest.TestCase):
+    def test_already_configured_only_enables_output(self):
+        pipeline, _ = make_pipeline("A")
+        state = SupplyState(voltage=5.0, current=0.2, output_on=False, ovp=6.0,
+                            ovp_enabled=True, ovp_tripped=False, range="P35V")
+
+        self.assertEqual(plan_commands(pipeline, state, A_TARGET), [(SupplyCommand.OPEN_OUTPUT, None)])
+
+    def test_unknown_state_sends_everything(self):
+        pipeline, _ = make_pipeline("A")
+
+        cmds = [c for c, _ in plan_commands(pipeline, SupplyState(), A_TARGET)]
+
+        self.assertEqual(cmds, [
+            SupplyCommand.CLOSE_OUTPUT,
+            SupplyCommand.SET_RANGE_LOW,
+            SupplyCommand.OVP_SET,
+            SupplyCommand.OVP_ENABLE,
+            SupplyCommand.OVP_CLEAR,
+            SupplyCommand.SET_VOLTAGE,
+            SupplyCommand.SET_CURRENT,
+            SupplyCommand.OPEN_OUTPUT,
+        ])
+
+    def test_range_change_cycles_output(self):
+        pipeline, _ = make_pipeline("A")
+        state = SupplyState(voltage=5.0, current=0.2, output_on=True, ovp=6.0,
+                            ovp_enabled=True, ovp_tripped=False, range="P60V")
+
+        cmds = [c for c, _ in plan_commands(pipeline, state, A_TARGET)]
+
+        self.assertEqual(cmds, [SupplyCommand.CLOSE_OUTPUT, SupplyCommand.SET_RANGE_LOW, SupplyCommand.OPEN_OUTPUT])
+
+    def test_rail_change_resends_setpoints(self):
+        pipeline, _ = make_pipeline("B")
+        state = SupplyState(voltage=5.0, current=0.5, output_on=True, rail="P6V")
+
+        plan = plan_commands(pipeline, state, TargetConfig(voltage=5.0, current=0.5, output_on=True, rail="P25V"))
+
+        self.assertEqual(plan, [
+            (SupplyCommand.SELECT_P25V, None),
+            (SupplyCommand.SET_VOLTAGE, 5.0),
+            (SupplyCommand.SET_CURRENT, 0.5),
+        ])
+
+    def test_setpoint_within_resolution_is_equal(self):
+        pipeline, _ = make_pipeline("B")
+        state = SupplyState(voltage=5.0001, current=0.5, output_on=True, rail="P6V")
+
+        self.assertEqual(plan_commands(pipeline, state, TargetConfig(voltage=5.0, current=0.5, rail="P6V")), [])
+
+
+class TestApplyTarget(unittest.TestCase):
+    def test_warm_start_is_one_query_and_one_write(self):
+        pipeline, transport = make_pipeline("A")
+        transport.send_and_receive.return_value = A_RESPONSE.replace("+5.00000000E+00", "+3.30000000E+00")
+
+        sent = apply_target(pipeline, A_TARGET)
+
+        self.assertEqual(sent, [(SupplyCommand.SET_VOLTAGE, 5.0), (SupplyCommand.OPEN_OUTPUT, None)])
+        transport.send_and_receive.assert_called_once()
+        transport.write_line.assert_called_once_with("VOLT 5.000;:OUTP ON")
+
+    def test_nothing_sent_when_at_target(self):
+        pipeline, transport = make_pipeline("A")
+        transport.send_and_receive.return_value = A_RESPONSE
+
+        sent = apply_target(pipeline, replace(A_TARGET, output_on=False))
+
+        self.assertEqual(sent, [])
+        transport.write_line.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+# /unit_test/test_sniffer.py
+
+import io
+import os
+import threading
+import time
+import unittest
+
+from src.sniffer import ByteRing, Frame, FrameDecoder, SerialSniffer, is_response_text, main, pair_frames
+
+
+class FakeClock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self) -> float:
+        return self.t
+
+
+class ChunkSource:
+    """
+    Hands out pre-cut chunks, one per readinto(), advancing the fake clock.
+    """
+
+    def __init__(self, clock: FakeClock, chunks):
+        self.clock = clock
+        self.chunks = list(chunks)
+
+    def readinto(self, buf) -> int:
+        if not self.chunks:
+            return 0
+        dt, data = self.chunks.pop(0)
+        self.clock.t += dt
+        buf[:len(data)] = data
+        return len(data)
+
+
+def frame(direction, text, t_first, t_last=None):
+    return Frame(direction, text, t_first, t_first if t_last is None else t_last, len(text) + 1, 1, 0.0, 0)
+
+
+class TestByteRing(unittest.TestCase):
+    def test_find_and_copy_across_wrap(self):
+        ring = ByteRing(capacity=8, max_chunks=4)
+        ring.append(b"ABCDEF", 1.0)
+        ring.append(b"G\nHI", 2.0)        # wraps: "G\n" at 6-7, "HI" at 0-1
+
+        self.assertEqual(ring.tail, 2)
+        self.assertEqual(ring.find(b"\n", 2, ring.head), 7)
+        self.assertEqual(ring.copy(4, 10), b"EFG\nHI")
+        self.assertEqual(ring.chunk_times(4, 10), [1.0, 2.0])
+
+    def test_fill_from_reads_into_ring_without_intermediate_buffer(self):
+        clock = FakeClock()
+        ring = ByteRing(capacity=16)
+        src = io.BytesIO(b"*IDN?\n")
+
+        n = ring.fill_from(src, clock, max_read=4)
+
+        self.assertEqual(n, 4)
+        self.assertEqual(ring.copy(0, 4), b"*IDN")
+        self.assertEqual(ring.chunks, 1)
+
+
+class TestFrameDecoder(unittest.TestCase):
+    def test_frame_spanning_chunks_reports_gap(self):
+        clock = FakeClock()
+        ring = ByteRing(capacity=64)
+        dec = FrameDecoder(ring, "rx")
+        src = ChunkSource(clock, [(0.010, b"+5.00"), (0.004, b"0E+00\r"), (0.001, b"\n+0.1\n")])
+
+        frames = []
+        for _ in range(3):
+            ring.fill_from(src, clock)
+            frames += dec.feed()
+
+        self.assertEqual([f.text for f in frames], ["+5.000E+00", "+0.1"])
+        self.assertEqual(frames[0].chunks, 3)
+        self.assertAlmostEqual(frames[0].t_first, 0.010)
+        self.assertAlmostEqual(frames[0].t_last, 0.015)
+        self.assertAlmostEqual(frames[0].max_gap_s, 0.004)
+        self.assertEqual(dec.partial_bytes, 0)
+
+    def test_noise_bytes_are_counted(self):
+        ring = ByteRing(capacity=64)
+        dec = FrameDecoder(ring, "rx")
+        ring.append(b"\x00\xffOK\r\n", 1.0)
+
+        (f,) = dec.feed()
+
+        self.assertEqual(f.noise, 2)
+
+    def test_overrun_when_frame_outgrows_ring(self):
+        ring = ByteRing(capacity=8)
+        dec = FrameDecoder(ring, "rx")
+        ring.append(b"ABCDEF", 1.0)
+        dec.feed()
+        ring.append(b"GHIJK\n", 2.0)
+
+        frames = dec.feed()
+
+        self.assertEqual(dec.overruns, 1)
+        self.assertEqual(frames[0].text, "EFGHIJK")
+
+
+class TestPairFrames(unittest.TestCase):
+    def test_tx_rx_pairing_and_gaps(self):
+        frames = [
+            frame("rx", "+5.0", 0.120, 0.125),
+            frame("tx", "MEAS:VOLT?", 0.100),
+            frame("tx", "VOLT 5.000", 0.050),
+        ]
+
+        result = pair_frames(frames)
+
+        (ex,) = result.exchanges
+        self.assertEqual(ex.command.key, "MEAS:VOLT?")
+        self.assertAlmostEqual(ex.gap_s, 0.020)
+        self.assertAlmostEqual(ex.transfer_s, 0.005)
+        self.assertEqual(result.unanswered, [])
+
+    def test_mixed_tap_and_unanswered(self):
+        frames = [
+            frame("mixed", "*IDN?", 0.0),
+            frame("mixed", "HP,E3631A", 0.05),
+            frame("mixed", "MEAS:CURR?", 1.0),
+            frame("mixed", "OUTP OFF", 4.0),
+        ]
+
+        result = pair_frames(frames, timeout_s=2.0)
+
+        self.assertEqual(len(result.exchanges), 1)
+        self.assertEqual(result.exchanges[0].response.text, "HP,E3631A")
+        self.assertEqual([f.text for f in result.unanswered], ["MEAS:CURR?"])
+
+    def test_mixed_tap_new_query_is_not_taken_as_reply(self):
+        frames = [
+            frame("mixed", "*IDN?", 0.0),
+            frame("mixed", "MEAS:VOLT?", 0.3),
+            frame("mixed", "+5.000", 0.35),
+        ]
+
+        result = pair_frames(frames)
+
+        (ex,) = result.exchanges
+        self.assertEqual((ex.command.text, ex.response.text), ("MEAS:VOLT?", "+5.000"))
+        self.assertEqual([f.text for f in result.unanswered], ["*IDN?"])
+
+    def test_mixed_frame_classification(self):
+        for text in ("+5.000", "1", '"P6V"', '+0,"No error"'):
+            self.assertTrue(is_response_text(text, awaiting_reply=False), text)
+        for text in ("*RST", "VOLT 5.000", "SYST:REM", ":OUTP ON", "SYST:ERR?"):
+            self.assertFalse(is_response_text(text, awaiting_reply=True), text)
+        self.assertTrue(is_response_text("HP,E3631A,0,2.1-5.0-1.0", awaiting_reply=True))
+        self.assertTrue(is_response_text("P6V", awaiting_reply=True))
+        self.assertFalse(is_response_text("P6V", awaiting_reply=False))
+
+
+@unittest.skipUnless(hasattr(os, "pipe"), "needs os.pipe")
+class TestSerialSniffer(unittest.TestCase):
+    def test_pipe_taps_produce_summary(self):
+        tx_r, tx_w = os.pipe()
+        rx_r, rx_w = os.pipe()
+        tx_src = io.FileIO(tx_r, "rb", closefd=True)
+        rx_src = io.FileIO(rx_r, "rb", closefd=True)
+        sniffer = SerialSniffer({"tx": tx_src, "rx": rx_src})
+
+        def device():
+            for _ in range(3):
+                os.write(tx_w, b"MEAS:VOLT?\r\n")
+                time.sleep(0.01)
+                os.write(rx_w, b"+5.00")
+                time.sleep(0.002)
+                os.write(rx_w, b"0E+00\r\n")
+            os.close(tx_w)
+            os.close(rx_w)
+
+        writer = threading.Thread(target=device)
+        writer.start()
+        sniffer.run(duration_s=0.3)
+        writer.join()
+        tx_src.close()
+        rx_src.close()
+
+        summary = sniffer.summary()
+
+        self.assertEqual(summary.exchanges, 3)
+        self.assertEqual(summary.frames, {"tx": 3, "rx": 3})
+        stats = summary.gap_by_command["MEAS:VOLT?"]
+        self.assertEqual(stats.count, 3)
+        self.assertGreaterEqual(stats.min_s, 0.005)
+        self.assertIn("rx", summary.inter_chunk)
+        self.assertTrue(any("cmd->resp gap" in line for line in summary.lines()))
+
+
+class TestSnifferCli(unittest.TestCase):
+    def test_requires_a_port(self):
+        with self.assertRaises(SystemExit):
+            main([])
+
+    def test_send_requires_single_port(self):
+        with self.assertRaises(SystemExit):
+            main(["--tx", "COM8", "--send", "*IDN?"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# /unit_test/test_sync_sampler.py
+
+import unittest
+from unittest.mock import MagicMock
+
+from src.enums import SupplyCommand
+from src.sync_sampler import SyncResult, SupplySeries, SynchronizedSampler, SyncSamplerError
+from src.transport import TimedResponse
+
+
+def make_pipeline(name, values, t_offset=0.0):
+    pipeline = MagicMock()
+    pipeline.driver.name = name
+    responses = [TimedResponse(str(v), t_offset + i, t_offset + i + 0.02) for i, v in enumerate(values)]
+    pipeline.query_timed.side_effect = responses
+    return pipeline
+
+
+class TestSynchronizedSampler(unittest.TestCase):
+    def test_run_collects_one_sample_per_round_per_supply(self):
+        pipelines = {
+            "A": make_pipeline("A", [5.0, 5.1, 5.2]),
+            "B": make_pipeline("B", [12.0, 12.1, 12.2], t_offset=0.01),
+        }
+
+        res = SynchronizedSampler(pipelines, cmd=SupplyCommand.MEASURE_VOLTAGE).run(rounds=3)
+
+        self.assertEqual(res.series["A"].values, [5.0, 5.1, 5.2])
+        self.assertEqual(res.series["B"].values, [12.0, 12.1, 12.2])
+        self.assertEqual(len(res.t_ref), 3)
+        self.assertAlmostEqual(res.t_ref[0], (0.01 + 0.02) / 2.0)
+        for p in pipelines.values():
+            p.query_timed.assert_called_with(SupplyCommand.MEASURE_VOLTAGE, channel=None)
+
+    def test_worker_error_aborts_all_and_raises(self):
+        bad = MagicMock()
+        bad.query_timed.side_effect = RuntimeError("port gone")
+        pipelines = {"A": make_pipeline("A", [5.0] * 3), "B": bad}
+
+        with self.assertRaises(SyncSamplerError):
+            SynchronizedSampler(pipelines).run(rounds=3)
+
+    def test_aligned_interpolates_onto_reference_grid(self):
+        res = SyncResult(
+            t_ref=[1.0, 2.0],
+            series={
+                "A": SupplySeries(values=[0.0, 10.0], t_mid=[0.5, 1.5]),
+                "B": SupplySeries(values=[1.0, None], t_mid=[1.0, 2.0]),
+            },
+        )
+
+        aligned = res.aligned()
+
+        self.assertEqual(aligned["A"], [5.0, 10.0])
+        self.assertEqual(aligned["B"], [1.0, 1.0])
+        self.assertEqual(res.skew("A"), [-0.5, -0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+# /unit_test/test_tcp_transport.py
+
+import json
+import os
+import socketserver
+import tempfile
+import threading
+import unittest
+
+from src.config import TcpConfig
+from src.drivers.map_driver import MapBasedDriver
+from src.enums import SupplyCommand
+from src.pipeline import SupplyPipeline
+from src.supply_config import SupplyConfigError, load_supply_profiles
+from src.tcp_transport import TcpConnectionPool, TcpTransport, TcpTransportError
+from src.transport_factory import TransportFactoryError, create_transport, link_config
+
+
+class FakeScpiHandler(socketserver.StreamRequestHandler):
+    """
+    Minimal raw-SCPI stand-in: answers *IDN? and VOLT?, remembers VOLT <v>,
+    ignores other writes, never answers SILENT?, hangs up on BYE.
+    """
+
+    def handle(self):
+        self.server.connections += 1
+        for raw in self.rfile:
+            line = raw.decode().strip()
+            self.server.received.append(line)
+            if line == "*IDN?":
+                self.wfile.write(b"FAKE,TCP-PSU,0,1.0\n")
+            elif line == "VOLT?":
+                self.wfile.write(f"{self.server.volt:+.8E}\n".encode())
+            elif line.startswith("VOLT "):
+                self.server.volt = float(line.split()[1])
+            elif line == "BYE":
+                return
+
+
+class FakeScpiServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeScpiHandler)
+        self.connections = 0
+        self.received = []
+        self.volt = 0.0
+
+
+def make_driver() -> MapBasedDriver:
+    return MapBasedDriver(
+        driver_name="LAN",
+        command_map={
+            SupplyCommand.IDN: "*IDN?",
+            SupplyCommand.SET_VOLTAGE: "VOLT {value}",
+            SupplyCommand.QUERY_VOLTAGE: "VOLT?",
+        },
+        expect_response_set={SupplyCommand.IDN, SupplyCommand.QUERY_VOLTAGE},
+    )
+
+
+class TestTcpTransport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = FakeScpiServer()
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.pool = TcpConnectionPool()
+        self.cfg = TcpConfig(host="127.0.0.1", port=self.server.server_address[1], timeout_s=1.0)
+
+    def tearDown(self) -> None:
+        self.pool.close_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_pipeline_runs_over_tcp(self):
+        transport = TcpTransport(self.cfg, pool=self.pool)
+        pipeline = SupplyPipeline(transport=transport, driver=make_driver())
+        transport.open()
+        try:
+            self.assertEqual(pipeline.execute(SupplyCommand.IDN), "FAKE,TCP-PSU,0,1.0")
+            pipeline.execute(SupplyCommand.SET_VOLTAGE, value=5.0)
+            self.assertEqual(float(pipeline.execute(SupplyCommand.QUERY_VOLTAGE)), 5.0)
+        finally:
+            transport.close()
+        self.assertEqual(self.server.received, ["*IDN?", "VOLT 5.000", "VOLT?"])
+
+    def test_pool_reuses_connection_across_open_close(self):
+        for _ in range(3):
+            transport = TcpTransport(self.cfg, pool=self.pool)
+            transport.open()
+            self.assertEqual(transport.send_and_receive("*IDN?"), "FAKE,TCP-PSU,0,1.0")
+            transport.close()
+
+        self.assertEqual(self.pool.connects, 1)
+        self.assertEqual(self.pool.reuses, 2)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_dead_pooled_connection_is_replaced(self):
+        transport = TcpTransport(self.cfg, pool=self.pool)
+        transport.open()
+        transport.write_line("BYE")
+        transport.close()
+
+        # Give the server a moment to hang up
+        threading.Event().wait(0.1)
+
+        transport.open()
+        self.assertEqual(transport.send_and_receive("*IDN?"), "FAKE,TCP-PSU,0,1.0")
+        transport.close()
+        self.assertEqual(self.pool.connects, 2)
+
+    def test_read_timeout_returns_empty(self):
+        transport = TcpTransport(self.cfg, pool=self.pool)
+        transport.open()
+        try:
+            timed = transport.send_and_receive_timed("SILENT?", timeout_s=0.05)
+        finally:
+            transport.close()
+        self.assertEqual(timed.text, "")
+        self.assertGreaterEqual(timed.t_recv - timed.t_send, 0.05)
+
+    def test_requires_open(self):
+        with self.assertRaises(TcpTransportError):
+            TcpTransport(self.cfg, pool=self.pool).write_line("*IDN?")
+
+    def test_connect_failure_raises(self):
+        # Bind and release a port so nothing is listening on it
+        with socketserver.TCPServer(("127.0.0.1", 0), socketserver.BaseRequestHandler) as probe:
+            port = probe.server_address[1]
+        with self.assertRaises(TcpTransportError):
+            TcpTransport(TcpConfig(host="127.0.0.1", port=port, connect_timeout_s=0.5), pool=None).open()
+
+
+class TestTcpProfiles(unittest.TestCase):
+    def load(self, supply: dict):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "power_supplies.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"default": "L", "supplies": {"L": supply}}, f)
+            return load_supply_profiles(path)[1]["L"]
+
+    def test_tcp_profile_without_serial_section(self):
+        profile = self.load({
+            "driver": "map",
+            "transport": "tcp",
+            "tcp": {"port": 5025, "timeout_s": 0.5},
+            "command_map": {"IDN": "*IDN?"},
+        })
+
+        self.assertEqual(profile.transport, "tcp")
+        self.assertEqual(profile.tcp.timeout_s, 0.5)
+        self.assertEqual(link_config(profile, "10.0.0.7"), TcpConfig(host="10.0.0.7", port=5025, timeout_s=0.5))
+        self.assertEqual(link_config(profile, "10.0.0.7:5026").port, 5026)
+        self.assertIsInstance(create_transport(profile, "10.0.0.7"), TcpTransport)
+
+    def test_link_config_ipv6_addresses(self):
+        profile = self.load({"driver": "map", "transport": "tcp", "tcp": {}, "command_map": {}})
+
+        for address, host, port in (
+            ("fe80::1", "fe80::1", 5025),
+            ("[fe80::1]", "fe80::1", 5025),
+            ("[fe80::1]:5026", "fe80::1", 5026),
+        ):
+            cfg = link_config(profile, address)
+            self.assertEqual((cfg.host, cfg.port), (host, port))
+
+        for bad in ("[fe80::1", "[fe80::1]5026", "host:abc"):
+            with self.assertRaises(TransportFactoryError):
+                link_config(profile, bad)
+
+    def test_serial_is_default_and_required(self):
+        profile = self.load({"driver": "map", "serial": {}, "command_map": {}})
+        self.assertEqual(profile.transport, "serial")
+        self.assertIsNone(profile.tcp)
+        self.assertEqual(link_config(profile, "COM4").port, "COM4")
+
+        with self.assertRaises(SupplyConfigError):
+            self.load({"driver": "map", "command_map": {}})
+
+    def test_unknown_transport_rejected(self):
+        with self.assertRaises(SupplyConfigError):
+            self.load({"driver": "map", "transport": "usb", "command_map": {}})
+
+
+if __name__ == "__main__":
+    unittest.main()
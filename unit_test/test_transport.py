@@ -55,6 +55,19 @@ class TestSerialTransport(unittest.TestCase):
         tr._ser.flush.assert_called_once()
         self.assertEqual(resp, "OK")
 
+    def test_send_and_receive_timed_orders_timestamps(self):
+        tr = SerialTransport(self.cfg)
+        tr._ser = MagicMock()
+        tr._ser.is_open = True
+
+        tr._ser.readline.return_value = b"5.000\n"
+
+        resp = tr.send_and_receive_timed("MEAS:VOLT?", settle_s=0)
+
+        self.assertEqual(resp.text, "5.000")
+        self.assertLessEqual(resp.t_send, resp.t_mid)
+        self.assertLessEqual(resp.t_mid, resp.t_recv)
+
 
 if __name__ == "__main__":
     unittest.main()